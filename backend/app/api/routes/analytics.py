@@ -21,7 +21,7 @@ from typing import Optional
 from app.core.database import get_db
 from app.models.attendance import AttendanceLog, Student
 from app.models.session import AttendanceSession, SessionStatus
-from app.services.anomaly_service import RiskLevel
+from app.services.anomaly_service import RiskLevel, AnomalyContext, compute_bulk_risk, score_context
 
 router = APIRouter()
 
@@ -281,6 +281,13 @@ def get_security_report(
     
     top_flagged = sorted(student_anomaly_counts.items(), key=lambda x: x[1], reverse=True)[:10]
     
+    # Live failure/device risk for the flagged students, one query for all
+    current = compute_bulk_risk(db, [sid for (sid, _), _ in top_flagged], since=cutoff)
+    current_risk = {
+        sid: score_context(current.get(sid, AnomalyContext()))
+        for (sid, _), _ in top_flagged
+    }
+    
     return {
         "period_days": days,
         "total_anomalies": len(anomalies),
@@ -296,7 +303,13 @@ def get_security_report(
             "medium": len([a for a in anomalies if a.anomaly_reason and "🟡" in a.anomaly_reason])
         },
         "flagged_students": [
-            {"student_id": sid, "name": name, "anomaly_count": count}
+            {
+                "student_id": sid,
+                "name": name,
+                "anomaly_count": count,
+                "current_risk_level": current_risk[sid].risk_level.value,
+                "current_risk_score": current_risk[sid].risk_score
+            }
             for (sid, name), count in top_flagged
         ],
         "recommendations": [
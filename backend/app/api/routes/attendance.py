@@ -1,18 +1,21 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, BackgroundTasks, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, cast, Date, desc, or_
 from datetime import timedelta, timezone
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Optional, List
 from app.core.database import get_db
 from app.core.config_thresholds import thresholds
 from app.models.attendance import Student, AttendanceLog
 from app.models.session import AttendanceSession, SessionStatus
+from app.models.face_model import TRAINING_SUFFIXES
 from app.services.face_service import face_service
 from app.services.verification_service import verification_service
 from app.services.liveness_service import liveness_service
-from app.services.anomaly_service import detect_anomalies
+from app.services.anomaly_service import analyze_in_request, analyze_full_async
+from app.services.response_cache import students_cache, logs_cache
 from datetime import datetime
+import asyncio
 import os
 import shutil
 import aiofiles
@@ -50,6 +53,49 @@ class ManualSubmitRequest(BaseModel):
     submitted_by: str | None = None
 
 
+class AttendanceLogRead(BaseModel):
+    """One row of GET /logs"""
+    id: int
+    student_id: Optional[int] = None
+    student_name: Optional[str] = None
+    session_id: Optional[int] = None
+    timestamp: datetime
+    status: str
+    confidence: Optional[float] = None
+    confidence_label: Optional[str] = None
+    is_proxy_suspected: Optional[bool] = None
+    verification_method: Optional[str] = None
+    frame_count: Optional[int] = None
+    liveness_passed: Optional[bool] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Compiled once; validates query rows and writes the JSON bytes in pydantic-core
+ATTENDANCE_LOG_LIST_ADAPTER = TypeAdapter(list[AttendanceLogRead])
+
+
+class StudentRead(BaseModel):
+    """One row of GET /students"""
+    id: int
+    name: str
+    roll_number: str
+    email: Optional[str] = None
+    photo_folder_path: str
+    fingerprint_id: Optional[str] = None
+    id_card_code: Optional[str] = None
+    biometric_consent: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    risk_score: Optional[float] = None
+    is_flagged: Optional[bool] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+STUDENT_LIST_ADAPTER = TypeAdapter(list[StudentRead])
+
+
 class AttendanceMarkResponse(BaseModel):
     """Response for attendance marking"""
     success: bool
@@ -150,10 +196,8 @@ def _check_duplicate_attendance(
 
 
 async def _read_frames(files: list[UploadFile]) -> list[bytes]:
-    frames: list[bytes] = []
-    for f in files:
-        frames.append(await f.read())
-    return frames
+    # Spooled uploads are read in worker threads; read them concurrently
+    return list(await asyncio.gather(*(f.read() for f in files)))
 
 
 def _init_face_state(verify_result: dict) -> dict:
@@ -293,6 +337,8 @@ def _build_attendance_response(
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
     ip_address: Optional[str] = None,
+    session: Optional[AttendanceSession] = None,
+    background_tasks: Optional[BackgroundTasks] = None,
 ) -> AttendanceMarkResponse:
     if state["biometric_fallback"] and not fingerprint_data and not id_card_scan:
         return AttendanceMarkResponse(
@@ -321,16 +367,16 @@ def _build_attendance_response(
         ip_address=ip_address
     )
     
-    # Anomaly Detection
-    anomalies = detect_anomalies(db, log, latitude, longitude)
-    if anomalies:
-        log.is_anomaly = True
-        log.anomaly_reason = ", ".join(anomalies)
-        state["notes"].append(f"⚠️ Anomaly: {log.anomaly_reason}")
+    # Anomaly Detection (full analysis inline only when the DB-free checks flag the log)
+    anomaly, complete = analyze_in_request(db, log, latitude, longitude, session=session)
+    if anomaly.is_anomaly:
+        state["notes"].append(f"⚠️ Anomaly ({anomaly.risk_level.value}): {log.anomaly_reason}")
         
     db.add(log)
     db.commit()
     db.refresh(log)
+    if not complete and background_tasks is not None:
+        background_tasks.add_task(analyze_full_async, log.id)
     
     return AttendanceMarkResponse(
         success="Verified" in state["status"] and not state["proxy_suspected"],
@@ -349,6 +395,20 @@ def _build_attendance_response(
 
 # ========== Registration Endpoint ==========
 
+def _has_identical_image(folder: Path, contents: bytes) -> bool:
+    """True if any training image in folder (every suffix LBPH trains on) has exactly these bytes."""
+    with os.scandir(folder) as it:
+        for entry in it:
+            if (
+                entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in TRAINING_SUFFIXES
+                and entry.stat().st_size == len(contents)
+                and Path(entry.path).read_bytes() == contents
+            ):
+                return True
+    return False
+
+
 @router.post("/register")
 async def register(
     name: str = Form(...), 
@@ -382,10 +442,21 @@ async def register(
             except Exception:
                 next_index = len(existing_files) + 1
 
-        file_path = folder_path / f"{next_index}.jpg"
         contents = await file.read()
-        async with aiofiles.open(file_path, "wb") as buffer:
-            await buffer.write(contents)
+        # A re-uploaded image changes nothing LBPH learns from; skip the
+        # write and the full retrain it would trigger. Off the event loop:
+        # it may read every same-sized image in the folder
+        duplicate_image = await asyncio.to_thread(_has_identical_image, folder_path, contents)
+        while not duplicate_image:
+            # Exclusive create: a concurrent registration (in any worker) that
+            # picked the same number gets FileExistsError and takes the next one
+            file_path = folder_path / f"{next_index}.jpg"
+            try:
+                async with aiofiles.open(file_path, "xb") as buffer:
+                    await buffer.write(contents)
+                break
+            except FileExistsError:
+                next_index += 1
             
         # Create DB entry
         new_student = Student(
@@ -399,7 +470,8 @@ async def register(
         db.commit()
         db.refresh(new_student)
         
-        face_service.retrain_model()
+        if not duplicate_image:
+            await asyncio.to_thread(face_service.retrain_model)
 
         return {
             "message": "Student registered successfully", 
@@ -417,6 +489,7 @@ async def register(
 @router.post("/mark", response_model=AttendanceMarkResponse)
 async def mark_attendance(
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     session_id: Optional[int] = Form(None),
     student_id: str = Form(None),       # Claimed Identity
@@ -437,13 +510,13 @@ async def mark_attendance(
     - Anomaly detection (Location/Time/Behavior)
     """
     try:
-        _get_session_or_raise(db, session_id)
+        session = _get_session_or_raise(db, session_id)
         
         # Read image bytes
         frame_bytes = await file.read()
         
         # Face Verification
-        verify_result = face_service.verify_student(frame_bytes)
+        verify_result = await asyncio.to_thread(face_service.verify_student, frame_bytes)
         
         state = _init_face_state(verify_result)
         state, duplicate_response = _process_face_result(
@@ -470,7 +543,9 @@ async def mark_attendance(
             id_card_scan,
             latitude,
             longitude,
-            ip_address
+            ip_address,
+            session=session,
+            background_tasks=background_tasks
         )
 
     except HTTPException:
@@ -485,6 +560,7 @@ async def mark_attendance(
 @router.post("/mark-multi", response_model=AttendanceMarkResponse)
 async def mark_attendance_multi(
     request: Request,
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     session_id: Optional[int] = Form(None),
     student_id: str = Form(None),
@@ -518,7 +594,9 @@ async def mark_attendance_multi(
             )
         
         # Run multi-frame verification
-        result = verification_service.verify_multi_frame(
+        # CPU-bound detection + LBPH; db is only used by that thread meanwhile
+        result = await asyncio.to_thread(
+            verification_service.verify_multi_frame,
             frames=frames,
             session_id=session_id,
             claimed_student_id=student_id,
@@ -528,7 +606,8 @@ async def mark_attendance_multi(
         # Liveness check if enabled
         liveness_passed = False
         if check_liveness and result.success:
-            liveness_result = liveness_service.check_liveness(frames)
+            # CPU-bound decode + FaceMesh; keep it off the event loop
+            liveness_result = await asyncio.to_thread(liveness_service.check_liveness, frames)
             liveness_passed = liveness_result.passed
             
             if not liveness_passed:
@@ -561,16 +640,16 @@ async def mark_attendance_multi(
             ip_address=request.client.host if request.client else None
         )
         
-        # Anomaly Detection
-        anomalies = detect_anomalies(db, log, latitude, longitude)
-        if anomalies:
-            log.is_anomaly = True
-            log.anomaly_reason = ", ".join(anomalies)
-            result.notes.append(f"⚠️ Anomaly: {log.anomaly_reason}")
+        # Anomaly Detection (full analysis inline only when the DB-free checks flag the log)
+        anomaly, complete = analyze_in_request(db, log, latitude, longitude, session=session)
+        if anomaly.is_anomaly:
+            result.notes.append(f"⚠️ Anomaly ({anomaly.risk_level.value}): {log.anomaly_reason}")
             
         db.add(log)
         db.commit()
         db.refresh(log)
+        if not complete:
+            background_tasks.add_task(analyze_full_async, log.id)
         
         return AttendanceMarkResponse(
             success=result.success,
@@ -730,50 +809,52 @@ async def manual_bulk_submit(
 
 # ========== Utility Endpoints ==========
 
-@router.get("/logs")
+@router.get("/logs", response_model=List[AttendanceLogRead])
 def get_logs(
     session_id: Optional[int] = None,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
     """Get attendance logs, optionally filtered by session."""
-    query = db.query(AttendanceLog)
+    body = logs_cache.get_or_build((session_id, limit), lambda: _build_logs(db, session_id, limit))
+    return Response(body, media_type="application/json")
+
+
+def _build_logs(db: Session, session_id: Optional[int], limit: int) -> bytes:
+    # One joined query for the rows and their student names
+    query = db.query(
+        AttendanceLog.id,
+        AttendanceLog.student_id,
+        Student.name.label("student_name"),
+        AttendanceLog.session_id,
+        AttendanceLog.timestamp,
+        AttendanceLog.status,
+        AttendanceLog.confidence,
+        AttendanceLog.confidence_label,
+        AttendanceLog.is_proxy_suspected,
+        AttendanceLog.verification_method,
+        AttendanceLog.frame_count,
+        AttendanceLog.liveness_passed,
+    ).outerjoin(Student, Student.id == AttendanceLog.student_id)
     
     if session_id:
         query = query.filter(AttendanceLog.session_id == session_id)
     
-    logs = query.order_by(AttendanceLog.timestamp.desc()).limit(limit).all()
+    rows = query.order_by(AttendanceLog.timestamp.desc()).limit(limit).all()
     
-    # Enrich with student names
-    results = []
-    for log in logs:
-        student_name = None
-        if log.student_id:
-            student = db.query(Student).filter(Student.id == log.student_id).first()
-            student_name = student.name if student else None
-        
-        results.append({
-            "id": log.id,
-            "student_id": log.student_id,
-            "student_name": student_name,
-            "session_id": log.session_id,
-            "timestamp": log.timestamp.isoformat(),
-            "status": log.status,
-            "confidence": log.confidence,
-            "confidence_label": log.confidence_label,
-            "is_proxy_suspected": log.is_proxy_suspected,
-            "verification_method": log.verification_method,
-            "frame_count": log.frame_count,
-            "liveness_passed": log.liveness_passed
-        })
-    
-    return results
+    # Serialized straight to bytes; skips jsonable_encoder and the stdlib json pass
+    logs = ATTENDANCE_LOG_LIST_ADAPTER.validate_python(rows)
+    return ATTENDANCE_LOG_LIST_ADAPTER.dump_json(logs)
 
 
-@router.get("/students")
+@router.get("/students", response_model=List[StudentRead])
 def get_students(db: Session = Depends(get_db)):
     """Get all registered students."""
-    return db.query(Student).all()
+    body = students_cache.get_or_build(
+        "all",
+        lambda: STUDENT_LIST_ADAPTER.dump_json(STUDENT_LIST_ADAPTER.validate_python(db.query(Student).all()))
+    )
+    return Response(body, media_type="application/json")
 
 
 @router.get("/stats")
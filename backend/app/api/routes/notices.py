@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.attendance import Notice
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import List
 
@@ -16,8 +16,7 @@ class NoticeBase(BaseModel):
 class NoticeResponse(NoticeBase):
     id: int
     date: datetime
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 @router.post("/", response_model=NoticeResponse)
 def create_notice(notice: NoticeBase, db: Session = Depends(get_db)):
@@ -5,11 +5,11 @@ Endpoints for creating, managing, and querying attendance sessions.
 
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_db, utc_now
 from app.models.session import AttendanceSession, SessionStatus
 from app.models.attendance import AttendanceLog, Student
 
@@ -40,8 +40,7 @@ class SessionResponse(BaseModel):
     min_confidence: float
     attendance_count: int = 0
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SessionSummary(BaseModel):
@@ -78,7 +77,7 @@ def create_and_start_session(
         min_confidence=data.min_confidence,
         created_by=data.created_by,
         status=SessionStatus.ACTIVE.value,
-        started_at=datetime.utcnow()
+        started_at=utc_now()
     )
     
     db.add(session)
@@ -8,6 +8,7 @@ import warnings
 with warnings.catch_warnings():
     warnings.simplefilter("ignore")
     import google.generativeai as genai
+import asyncio
 import json
 import io
 from sqlalchemy.orm import Session
@@ -307,8 +308,9 @@ async def upload_raw_timetable(file: UploadFile = File(...)):
         }
         """
 
-        # Prepare for Gemini (Images/PDFs)
-        response = model.generate_content([
+        # Prepare for Gemini (Images/PDFs); the blocking SDK call runs in a
+        # worker thread so other requests keep being served meanwhile
+        response = await asyncio.to_thread(model.generate_content, [
             prompt,
             {"mime_type": mime_type, "data": contents}
         ])
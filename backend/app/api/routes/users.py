@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.api.routes.auth import require_admin, get_password_hash
 from app.models.user import User, UserRole
-from app.schemas.user_management import UserCreate, UserRead, UserListResponse, UserDeleteResponse
+from app.schemas.user_management import UserCreate, UserRead, UserListResponse, UserDeleteResponse, USER_LIST_ADAPTER
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -12,7 +13,9 @@ router = APIRouter(prefix="/users", tags=["Users"])
 @router.get("", response_model=UserListResponse)
 async def list_users(_: User = Depends(require_admin), db: Session = Depends(get_db)):
     users = db.query(User).order_by(User.id).all()
-    return {"users": users}
+    rows = USER_LIST_ADAPTER.dump_python(USER_LIST_ADAPTER.validate_python(users), mode="json")
+    # Already validated against UserRead; skip FastAPI's second response_model pass
+    return JSONResponse({"users": rows})
 
 
 @router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -14,6 +14,12 @@ class Config:
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///attendance.db")
     DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
+    # Connection pool (server and file-backed SQLite databases). Keep DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # times the number of Uvicorn workers below the server's max_connections.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # seconds
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     AUTH_SECRET = os.getenv("AUTH_SECRET", "change-me-in-prod")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
@@ -28,6 +34,15 @@ class Config:
         "http://127.0.0.1:5174"
     ]
     
+    # GET /students and /logs bodies are reused for this long (seconds). Local
+    # writes clear them at once; this bounds staleness from other workers.
+    READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "5"))
+    
+    # Server (python -m app.main). Each worker is a separate process with its
+    # own LBPH model in memory; size this to RAM as well as cores. A retrain in
+    # one worker is picked up by the others from the saved model cache.
+    UVICORN_WORKERS = int(os.getenv("UVICORN_WORKERS", "4"))
+    
     # Timetable Generation
     DAYS_PER_WEEK = 5
     PERIODS_PER_DAY = 8
@@ -36,6 +51,7 @@ class Config:
     
     # Solver Configuration
     SOLVER_TIME_LIMIT = 120  # seconds
+    SOLVER_NUM_WORKERS = int(os.getenv("SOLVER_NUM_WORKERS", "0"))  # 0 = one per CPU core
     
     # File Upload
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -59,6 +59,9 @@ class VerificationThresholds:
     BLINK_DETECTION_TIMEOUT_SEC: float = 5.0  # Max time to detect blink
     EAR_BLINK_THRESHOLD: float = 0.21       # Eye Aspect Ratio for blink
     MIN_BLINK_FRAMES: int = 2               # Consecutive frames below threshold
+    LIVENESS_EARLY_EXIT: bool = True        # Stop analyzing frames after the first blink
+    LANDMARK_REUSE_MAX_DIFF: float = 3.0    # Eye-region mean abs diff (0-255) to reuse landmarks
+    LANDMARK_REUSE_MAX_FRAMES: int = 4      # Re-run FaceMesh after this many reused frames
     
     def to_dict(self) -> Dict[str, Any]:
         """Export all thresholds for API response"""
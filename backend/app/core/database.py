@@ -3,25 +3,100 @@ Database Configuration
 Enterprise-grade database setup with connection pooling and error handling
 """
 
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, event, make_url, SmallInteger
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.types import TypeDecorator
 from app.core.config import config
 
 class Base(DeclarativeBase):
     pass
 
+
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime, the convention stored in every DateTime column."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SmallIntEnum(TypeDecorator):
+    """
+    Store enum-like values as SMALLINT codes.
+    
+    `codes` maps the Python-side value (what the model attribute holds) to its
+    stored integer, e.g. ((UserRole.ADMIN, 3), ...). Comparisons against the
+    Python value in queries are translated to the code automatically.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.codes = tuple(codes)
+        self._to_code = {value: code for value, code in self.codes}
+        self._from_code = {code: value for value, code in self.codes}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Unknown values bind as NULL: filters match nothing, inserts hit NOT NULL
+        return self._to_code.get(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str) and not value.isdigit():
+            # Legacy row still holding the textual value
+            return self._from_code.get(self._to_code.get(value))
+        return self._from_code.get(int(value))
+
 # Database URL
 primary_url = config.DATABASE_URL
 fallback_url = "sqlite:///attendance.db"
 
+def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+    """
+    Per-connection settings. With synchronous=NORMAL a commit no longer
+    fsyncs in WAL mode (WAL stays crash-safe; only the last commits can roll
+    back on power loss). WAL itself is set once, by enable_wal().
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.close()
+
 def create_db_engine(url):
+    if "sqlite" in url:
+        if make_url(url).database in (None, "", ":memory:"):
+            # An in-memory database lives in its one connection; share it
+            return create_engine(
+                url,
+                poolclass=StaticPool,
+                echo=config.DEBUG_MODE,
+                connect_args={"check_same_thread": False}
+            )
+        # File databases get a connection per concurrent request, reused
+        # across requests, instead of every thread sharing one connection
+        engine = create_engine(
+            url,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            echo=config.DEBUG_MODE,
+            connect_args={"check_same_thread": False}
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
     return create_engine(
         url,
-        poolclass=StaticPool if "sqlite" in url else None,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
         pool_pre_ping=True,
-        echo=config.DEBUG_MODE,
-        connect_args={"check_same_thread": False} if "sqlite" in url else {}
+        echo=config.DEBUG_MODE
     )
 
 try:
@@ -48,6 +123,20 @@ def get_db():
     finally:
         db.close()
 
+def enable_wal():
+    """
+    Switch a file-backed SQLite database to WAL, so /logs readers run
+    alongside attendance writers.
+    
+    The journal mode is stored in the database file itself, so this runs once
+    from server startup (init_db) rather than on every connection: importing
+    this module (tests, scripts) leaves the file untouched.
+    """
+    if engine.dialect.name != "sqlite" or engine.url.database in (None, "", ":memory:"):
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
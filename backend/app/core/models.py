@@ -10,7 +10,7 @@ Enterprise Refactor:
 import cv2
 import numpy as np
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.models.attendance import Student, AttendanceLog
 from app.models.timetable import Teacher, Room, Subject, ClassGroup, TimetableEntry
 from app.models.face_model import FaceDetector, DATA_FACE_DIR
@@ -243,7 +243,9 @@ class ModelFactory:
     @staticmethod
     def get_attendance_logs(db: Session) -> List[dict]:
         """Get all attendance logs"""
-        logs = db.query(AttendanceLog).join(Student, AttendanceLog.student_id == Student.id, isouter=True).order_by(AttendanceLog.timestamp.desc()).all()
+        # joinedload fills log.student from the same SELECT; a bare join
+        # left it lazy and cost one query per row
+        logs = db.query(AttendanceLog).options(joinedload(AttendanceLog.student)).order_by(AttendanceLog.timestamp.desc()).all()
         result = []
         for log in logs:
             result.append({
@@ -3,7 +3,7 @@ Main FastAPI Application Entry Point
 Enterprise-grade unified system: Attendance + Timetable Generation
 """
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from app.models.attendance import Student, AttendanceLog, Base
@@ -16,22 +16,19 @@ from app.api.routes.sessions import router as sessions_router  # NEW: Sessions A
 from app.api.routes.analytics import router as analytics_router
 from app.core.config import config
 from app.core.config_thresholds import thresholds  # NEW: Thresholds config
-from app.core.database import create_tables, engine, SessionLocal
+from app.core.database import create_tables, enable_wal, engine, SessionLocal, get_db
+from app.services.face_service import face_service
 from app.core.logging import logger
 from app.api.routes.auth import get_password_hash
 from datetime import datetime, timezone
 from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import asyncio
+import os
 import uvicorn
 
 DEFAULT_FACULTY_NAME = "Dr. John Smith"
 
-# Initialize database
-logger.info("Initializing database...")
-from app.models.user import Base as UserBase
-UserBase.metadata.create_all(bind=engine)
-create_tables()
-logger.info("Database initialized successfully")
-
 # Ensure users table has required columns (handles older SQLite schemas)
 def ensure_user_schema() -> None:
     try:
@@ -54,7 +51,13 @@ def ensure_user_schema() -> None:
 
             # Backfill defaults for nullable legacy rows
             conn.execute(text("UPDATE users SET is_active = 1 WHERE is_active IS NULL"))
-            conn.execute(text("UPDATE users SET role = 'STUDENT' WHERE role IS NULL"))
+            # Roles are stored as SMALLINT codes (see USER_ROLE_CODES)
+            conn.execute(text(
+                "UPDATE users SET role = CASE role "
+                "WHEN 'STUDENT' THEN 1 WHEN 'FACULTY' THEN 2 WHEN 'ADMIN' THEN 3 ELSE role END "
+                "WHERE typeof(role) = 'text' AND role NOT GLOB '[0-9]*'"
+            ))
+            conn.execute(text("UPDATE users SET role = 1 WHERE role IS NULL"))
             conn.execute(text("UPDATE users SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"))
 
             # Backfill missing created_at values
@@ -65,7 +68,44 @@ def ensure_user_schema() -> None:
     except Exception as exc:
         logger.error(f"Failed to ensure user schema: {exc}")
 
-ensure_user_schema()
+# Ensure attendance_logs has derived columns and indexes added after release
+def ensure_attendance_schema() -> None:
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("PRAGMA table_info(attendance_logs)"))
+            existing_columns = {row[1] for row in result.fetchall()}
+
+            if "is_failed" not in existing_columns:
+                conn.execute(text("ALTER TABLE attendance_logs ADD COLUMN is_failed BOOLEAN NOT NULL DEFAULT 0"))
+                # One-shot backfill from the free-text status
+                conn.execute(text(
+                    "UPDATE attendance_logs SET is_failed = 1 "
+                    "WHERE status LIKE '%Rejected%' OR status LIKE '%Failed%'"
+                ))
+            if "risk_level" not in existing_columns:
+                conn.execute(text("ALTER TABLE attendance_logs ADD COLUMN risk_level VARCHAR(10)"))
+
+            # Superseded by idx_attendance_student_session_status (same prefix)
+            conn.execute(text("DROP INDEX IF EXISTS idx_attendance_student_session"))
+
+            # Session status is stored as SMALLINT codes (see SESSION_STATUS_CODES)
+            conn.execute(text(
+                "UPDATE attendance_sessions SET status = CASE status "
+                "WHEN 'pending' THEN 0 WHEN 'active' THEN 1 WHEN 'ended' THEN 2 ELSE status END "
+                "WHERE typeof(status) = 'text' AND status NOT GLOB '[0-9]*'"
+            ))
+
+            conn.commit()
+    except Exception as exc:
+        logger.error(f"Failed to ensure attendance schema: {exc}")
+
+    # create_all() skips indexes on tables that already exist
+    tables = (AttendanceLog.__table__, AttendanceSession.__table__, User.__table__)
+    for index in (index for table in tables for index in table.indexes):
+        try:
+            index.create(bind=engine, checkfirst=True)
+        except Exception as exc:
+            logger.error(f"Failed to create index {index.name}: {exc}")
 
 # Ensure default users exist (dev convenience)
 def ensure_default_users():
@@ -123,7 +163,22 @@ def ensure_default_users():
     finally:
         db.close()
 
-ensure_default_users()
+def init_db() -> None:
+    """Create tables, bring older schemas up to date and seed default users."""
+    logger.info("Initializing database...")
+    enable_wal()
+    try:
+        create_tables()  # Every model shares app.core.database.Base
+    except SQLAlchemyError as exc:
+        # Another worker created a table between our existence check and CREATE;
+        # a second pass skips the tables that now exist
+        if "already exists" not in str(exc):
+            raise
+        create_tables()
+    ensure_user_schema()
+    ensure_attendance_schema()
+    ensure_default_users()
+    logger.info("Database initialized successfully")
 
 # Create FastAPI app
 app = FastAPI(
@@ -152,12 +207,39 @@ app.include_router(analytics_router, prefix="/api/analytics", tags=["Analytics"]
 app.include_router(notices.router, prefix="/api/notices", tags=["Notices"])
 app.include_router(users_router.router, prefix="/api", tags=["Users"])
 
+# Set by `python -m app.main`, which initializes the database once before
+# starting the workers; inherited by their processes
+DB_INITIALIZED_ENV = "ATTENDIFY_DB_INITIALIZED"
+
+# At startup rather than import, so importing app.main (tests, tooling,
+# worker spawn) doesn't touch the database or hash passwords. Runs before
+# the server accepts requests.
+@app.on_event("startup")
+def initialize_database():
+    if os.environ.get(DB_INITIALIZED_ENV) != "1":
+        init_db()
+
+# Warm up per worker process, after Uvicorn has forked it
+def warm_up_services() -> None:
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        face_service.warm_up()
+        logger.info("Face service warmed up")
+    except Exception as exc:
+        logger.error(f"Warm-up failed: {exc}")
+
+@app.on_event("startup")
+async def schedule_warm_up():
+    # In the background: the server accepts requests while LBPH trains, and
+    # face requests that arrive early wait on the detector's init lock
+    asyncio.get_running_loop().run_in_executor(None, warm_up_services)
+
 # ==================== SEEDING & UTILITIES ====================
 
 @app.post("/api/seed")
-def seed_database():
+def seed_database(db: Session = Depends(get_db)):
     """Seed database with sample data for testing"""
-    db = SessionLocal()
     try:
         # Check if already seeded
         if db.query(Teacher).count() > 0:
@@ -171,8 +253,6 @@ def seed_database():
             Teacher(name="Prof. Sarah Wilson", email="sarah@university.edu", max_hours_per_day=6),
             Teacher(name="Dr. Robert Taylor", email="robert@university.edu", max_hours_per_day=5),
         ]
-        db.add_all(teachers)
-        db.commit()
         
         # Create Rooms
         rooms = [
@@ -182,8 +262,6 @@ def seed_database():
             Room(room_number="202", capacity=40, is_lab=True, room_type="Computer Lab"),
             Room(room_number="301", capacity=50, is_lab=False, room_type="Classroom"),
         ]
-        db.add_all(rooms)
-        db.commit()
         
         # Create Subjects
         subjects = [
@@ -193,8 +271,6 @@ def seed_database():
             Subject(name="Computer Networks", code="CS302", weekly_sessions=3, requires_lab=True),
             Subject(name="Software Engineering", code="CS401", weekly_sessions=3, requires_lab=False),
         ]
-        db.add_all(subjects)
-        db.commit()
         
         # Assign teachers to subjects
         subjects[0].teachers.extend([teachers[0], teachers[1]])
@@ -202,14 +278,16 @@ def seed_database():
         subjects[2].teachers.extend([teachers[2], teachers[3]])
         subjects[3].teachers.extend([teachers[3], teachers[4]])
         subjects[4].teachers.extend([teachers[0], teachers[4]])
-        db.commit()
         
         # Create Class Groups
         class_groups = [
             ClassGroup(name="CSE-A", semester=4, strength=60),
             ClassGroup(name="CSE-B", semester=4, strength=60),
         ]
-        db.add_all(class_groups)
+        
+        # One transaction: a single commit (one fsync on SQLite) instead of
+        # one per table, and a failure leaves nothing half-seeded behind
+        db.add_all(teachers + rooms + subjects + class_groups)
         db.commit()
         
         return {
@@ -224,8 +302,6 @@ def seed_database():
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Seeding failed: {str(e)}")
-    finally:
-        db.close()
 
 @app.get("/")
 def root():
@@ -270,4 +346,9 @@ def get_config():
     return config.get_config()
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+    # Production: one process per worker sidesteps the GIL for recognition.
+    # For auto-reload during development use backend/main.py instead.
+    # Schema changes run here once, not in every worker at the same time.
+    init_db()
+    os.environ[DB_INITIALIZED_ENV] = "1"
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, workers=config.UVICORN_WORKERS)
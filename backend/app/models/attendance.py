@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, Float, Boolean, Text, Index
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, Float, Boolean, Text, Index, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from datetime import datetime
-from app.core.database import Base
+from app.core.database import Base, utc_now
+
+
+FAILED_STATUS_MARKERS = ("Rejected", "Failed")
+
+
+def is_failed_status(status: str | None) -> bool:
+    """True for statuses recording a rejected or failed verification attempt."""
+    return bool(status) and any(marker in status for marker in FAILED_STATUS_MARKERS)
 
 
 class Student(Base):
@@ -27,8 +35,8 @@ class Student(Base):
     
     # Privacy & Compliance
     biometric_consent: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now, onupdate=utc_now)
     
     # Risk Profile (NEW)
     risk_score: Mapped[float] = mapped_column(Float, default=0.0)
@@ -57,8 +65,14 @@ class AttendanceLog(Base):
     # Indexes for performance
     __table_args__ = (
         Index('idx_attendance_timestamp', 'timestamp'),
-        Index('idx_attendance_student_session', 'student_id', 'session_id'),
+        # Covers the "already marked in this session?" lookup end to end
+        Index('idx_attendance_student_session_status', 'student_id', 'session_id', 'status'),
         Index('idx_attendance_anomaly', 'is_anomaly', 'timestamp'),
+        Index(
+            'idx_attendance_failed_student_ts', 'student_id', 'timestamp',
+            postgresql_where=text('is_failed'),
+            sqlite_where=text('is_failed = 1'),
+        ),
     )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -69,8 +83,9 @@ class AttendanceLog(Base):
         Integer, ForeignKey('attendance_sessions.id', ondelete='SET NULL'), nullable=True
     )
     
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=utc_now, index=True)
     status: Mapped[str] = mapped_column(String(100), nullable=False)
+    is_failed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)  # Derived from status
     confidence: Mapped[float] = mapped_column(Float, default=0.0)
     
     # Verification Details
@@ -92,15 +107,27 @@ class AttendanceLog(Base):
     is_anomaly: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     anomaly_reason: Mapped[str] = mapped_column(Text, nullable=True)
     risk_score: Mapped[float] = mapped_column(Float, default=0.0)
+    risk_level: Mapped[str] = mapped_column(String(10), nullable=True)  # Set by background analysis
     
     # Relationships
     student: Mapped["Student"] = relationship("Student", back_populates="attendance_logs")
     session = relationship("AttendanceSession", back_populates="attendance_logs")
     
+    @validates('status')
+    def _sync_is_failed(self, key, value):
+        self.is_failed = is_failed_status(value)
+        return value
+    
     def __repr__(self):
         return f"<AttendanceLog {self.id}: {self.status} @ {self.timestamp}>"
 
 
+# Composite indexes matching the anomaly-service lookups: latest log per
+# student (impossible travel) and recent activity per device.
+Index('ix_attendance_logs_student_ts', AttendanceLog.student_id, AttendanceLog.timestamp.desc())
+Index('ix_attendance_logs_ip_ts', AttendanceLog.ip_address, AttendanceLog.timestamp.desc())
+
+
 class Notice(Base):
     """System notices and announcements."""
     __tablename__ = 'notices'
@@ -109,6 +136,6 @@ class Notice(Base):
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     author: Mapped[str] = mapped_column(String(100), default="Admin")
-    date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    date: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     priority: Mapped[str] = mapped_column(String(20), default="normal")  # low, normal, high, urgent
@@ -18,13 +18,16 @@ Controls:
 
 import os
 import cv2
+import functools
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-import pickle
+import json
 
 # Try to import YOLO
 try:
@@ -34,30 +37,298 @@ except ImportError:
     YOLO_AVAILABLE = False
     print("[WARNING] ultralytics not installed, using Haar Cascade only")
 
+# YOLO weights are loaded once per process and shared by every FaceDetector
+# (inference goes through _YOLO_BATCHER below). On a GPU host, point
+# YOLO_WEIGHTS at a TensorRT engine exported on that GPU, e.g.
+#   YOLO('yolov8n.pt').export(format='engine', half=True, imgsz=320, dynamic=True, batch=8)
+# dynamic/batch let batched calls through; imgsz must match YOLO_IMGSZ.
+YOLO_WEIGHTS = os.getenv("YOLO_WEIGHTS", "yolov8n.pt")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_yolo():
+    return YOLO(YOLO_WEIGHTS)  # Failures raise and are not cached
+
+
 # Paths
 DATA_FACE_DIR = Path(__file__).parent / "_data-face"
 MODEL_CACHE_DIR = Path(__file__).parent / "_model_cache"
 VIDEO_DIR = Path(__file__).parent / "_videos"
-MODEL_VERSION = 2
+MODEL_VERSION = 3
+# Long side detection runs at; more pixels only add Haar/denoise work
+DETECTION_MAX_SIDE = 640
+# YOLO only finds people (Haar finds the face inside each box), and people
+# fill much of a classroom/webcam frame, so its input is letterboxed to 320
+# rather than the default 640: ~4x fewer pixels per inference
+YOLO_IMGSZ = 320
+# Person boxes are Haar-searched at no more than this long side; a face
+# inside a person box this big is still well above the 24 px cascade window
+PERSON_MAX_SIDE = 300
+TRAINING_SUFFIXES = ('.jpg', '.jpeg', '.png')
+
+# Per-face preprocessing constants, built once instead of on every face
+GAMMA = 1.2  # Brightening factor for night/low-light enhancement
+GAMMA_LUT = (((np.arange(256) / 255.0) ** (1.0 / GAMMA)) * 255).astype("uint8")
+SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                           [-1,  9, -1],
+                           [-1, -1, -1]])
+
+
+class YoloBatcher:
+    """
+    Run concurrent YOLO calls as one batched inference.
+
+    Ultralytics predictors aren't thread-safe, so only one inference runs at
+    a time. Instead of queueing on a lock, callers leave their image here;
+    whoever finds the model idle runs every waiting image in a single call
+    and hands each caller its own result. A lone caller runs immediately,
+    while the frames of a multi-frame upload, detected on parallel workers,
+    share one call. Every caller must pass the same model.
+    """
+    
+    def __init__(self, **predict_kwargs):
+        self.predict_kwargs = predict_kwargs
+        self._cond = threading.Condition()
+        self._pending: list = []
+        self._running = False
+    
+    def __call__(self, model, image: np.ndarray):
+        job = {"image": image, "done": False}
+        with self._cond:
+            self._pending.append(job)
+            while self._running and not job["done"]:
+                self._cond.wait()
+            if not job["done"]:
+                # Model is idle: run everything queued so far, ours included
+                self._running = True
+                batch, self._pending = self._pending, []
+        if job["done"]:
+            return self._result(job)
+        
+        try:
+            results = model([j["image"] for j in batch], **self.predict_kwargs)
+            for j, result in zip(batch, results):
+                j["result"] = result
+        except Exception as exc:
+            for j in batch:
+                j["error"] = exc
+        finally:
+            with self._cond:
+                for j in batch:
+                    j["done"] = True
+                self._running = False
+                self._cond.notify_all()
+        return self._result(job)
+    
+    @staticmethod
+    def _result(job: dict):
+        if "error" in job:
+            raise job["error"]
+        return job["result"]
+
+
+# Person detection only; half=True takes effect on CUDA, Ultralytics keeps fp32 on CPU
+_YOLO_BATCHER = YoloBatcher(imgsz=YOLO_IMGSZ, half=True, verbose=False, classes=[0], conf=0.5)
+
+
+# os.scandir reports entry types from the directory listing itself, so the
+# walks below don't stat every file just to classify it
+def _person_folders() -> List[os.DirEntry]:
+    """Person folders in DATA_FACE_DIR (unknown* folders are skipped)."""
+    with os.scandir(DATA_FACE_DIR) as it:
+        return [e for e in it if e.is_dir() and not e.name.startswith('unknown')]
+
+
+def _training_images(folder) -> List[os.DirEntry]:
+    with os.scandir(folder) as it:
+        return [e for e in it
+                if e.is_file() and os.path.splitext(e.name)[1].lower() in TRAINING_SUFFIXES]
 
 
-def get_folder_hash(folder: Path) -> str:
-    """Get hash of a folder's contents."""
-    files = sorted(folder.glob("*.jpg"))
-    content = ",".join(f"{f.name}:{f.stat().st_mtime}" for f in files)
+def get_folder_hash(folder) -> str:
+    """Get hash of a folder's training images (names, sizes, mtimes)."""
+    files = sorted(_training_images(folder), key=lambda e: e.name)
+    stats = ((e.name, e.stat()) for e in files)
+    content = ",".join(f"{name}:{st.st_size}:{st.st_mtime_ns}" for name, st in stats)
     return hashlib.md5(content.encode()).hexdigest()
 
 
+# Cache files are written to a per-process temp name and renamed into place,
+# so workers starting together never read a half-written file
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.{os.getpid()}.tmp{path.suffix}")
+
+
+def _write_json_atomic(path: Path, data) -> None:
+    tmp = _temp_path(path)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _cache_stamp() -> Optional[int]:
+    """mtime of folder_hashes.json, which is replaced last whenever a model is saved."""
+    try:
+        return os.stat(MODEL_CACHE_DIR / "folder_hashes.json").st_mtime_ns
+    except OSError:
+        return None
+
+
+class LiveDetection:
+    """
+    Detect + recognize on a background thread for the live preview.
+
+    The preview submits frames and draws whatever `results` last held. A frame
+    submitted while a detection is running replaces any frame still waiting,
+    so detection works on the newest frame and never falls behind the camera.
+    With recognize=False only the face rects are produced.
+    """
+    
+    def __init__(self, detector: "FaceDetector", recognize: bool = True):
+        self.detector = detector
+        self.recognize = recognize
+        # (detected frame, face rects, recognitions), replaced as one tuple
+        self.detection: Tuple[Optional[np.ndarray], list, list] = (None, [], [])
+        self._frame = None
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="live-detect", daemon=True)
+        self._thread.start()
+    
+    @property
+    def results(self) -> Tuple[list, list]:
+        """(face rects, recognitions) of the latest detection."""
+        return self.detection[1:]
+    
+    def submit(self, frame: np.ndarray):
+        with self._cond:
+            self._frame = frame
+            self._cond.notify()
+    
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+    
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._frame is not None or self._stopped)
+                if self._stopped:
+                    return
+                frame, self._frame = self._frame, None
+            faces = self.detector.detect_faces_fast(frame)
+            if not self.recognize:
+                self.detection = (frame, faces, [])
+                continue
+            self.detection = (frame, faces, [self.detector.recognize_face(frame, r) for r in faces])
+
+
+class FrameGrabber:
+    """
+    Read a camera on its own thread and hand out only the newest frame.
+
+    read() mirrors VideoCapture.read() but returns the latest frame the
+    driver delivered, waiting only if the caller has already seen it. A loop
+    that falls behind skips straight to the current frame instead of
+    draining stale ones, and a fast loop never redraws the same frame.
+    The grabber owns the capture: release() stops the thread, then the camera.
+    """
+    
+    def __init__(self, cap: cv2.VideoCapture):
+        self.cap = cap
+        self._frame = None
+        self._seq = 0  # Frames grabbed so far
+        self._seen = 0  # Last frame handed out
+        self._ok = True
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="camera-grab", daemon=True)
+        self._thread.start()
+    
+    def _loop(self):
+        while not self._stopped:
+            ret, frame = self.cap.read()
+            with self._cond:
+                if not ret:
+                    self._ok = False
+                else:
+                    self._frame = frame
+                    self._seq += 1
+                self._cond.notify_all()
+            if not ret:
+                return
+    
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != self._seen or not self._ok)
+            if self._seq == self._seen:
+                return False, None  # Camera stopped delivering
+            self._seen = self._seq
+            return True, self._frame
+    
+    def release(self):
+        self._stopped = True
+        self._thread.join()  # Never release the camera mid-read
+        self.cap.release()
+
+
+class FaceTracks:
+    """
+    Keep the preview's face boxes on the faces between detections.
+
+    A LiveDetection result describes a frame that is already a few frames old
+    when it arrives. Each detected face gets a KCF tracker started on that
+    frame, and every displayed frame moves the boxes along; a face whose
+    tracker loses it is dropped until the next detection. Needs a
+    LiveDetection with recognize=True.
+    """
+    
+    def __init__(self):
+        self._source = None  # Detection the trackers were started from
+        self._tracks: list = []  # (tracker, recognition)
+        # Grayscale features: ~40% cheaper per update than colour names, and
+        # faces track just as well (updates run on the UI thread)
+        self._params = cv2.TrackerKCF_Params()
+        self._params.desc_pca = cv2.TrackerKCF_GRAY
+        self._params.compressed_size = 1
+    
+    def update(self, frame: np.ndarray, detection: tuple) -> Tuple[list, list]:
+        """(face rects, recognitions) for `frame`."""
+        if detection is not self._source:
+            self._source = detection
+            self._tracks = []
+            detected_frame, faces, recognitions = detection
+            for rect, recognition in zip(faces, recognitions):
+                tracker = cv2.TrackerKCF_create(self._params)
+                try:
+                    tracker.init(detected_frame, tuple(int(v) for v in rect))
+                except cv2.error:
+                    continue  # Box too small/outside the frame to track
+                self._tracks.append((tracker, recognition))
+        
+        rects, recognitions, alive = [], [], []
+        for tracker, recognition in self._tracks:
+            ok, box = tracker.update(frame)
+            if ok:
+                alive.append((tracker, recognition))
+                rects.append(tuple(int(v) for v in box))
+                recognitions.append(recognition)
+        self._tracks = alive
+        return rects, recognitions
+
+
 class FaceDetector:
     """Face detection and recognition with video recording support."""
     
     def __init__(self, max_distance: float = 50.0, detection_scale: float = 0.6,
-                 skip_frames: int = 2, min_confidence: float = 50.0):  # Lowered for flexibility
+                 skip_frames: int = 2, min_confidence: float = 50.0,  # Lowered for flexibility
+                 load: bool = True):
         self.max_distance = max_distance  # Tighter threshold for enterprise accuracy
         self.detection_scale = detection_scale
         self.skip_frames = skip_frames
         self.min_confidence = min_confidence
-        self.known_face_labels: Dict[int, str] = {}
         self.label_counter = 0
         
         self.frame_count = 0
@@ -66,37 +337,73 @@ class FaceDetector:
         self.folder_hashes: Dict[str, str] = {}
         
         print("[INFO] Loading cascades...")
-        self.face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        self.alt_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_alt2.xml'
-        )
+        # detectMultiScale mutates the classifier, so each thread loads its own pair
+        self._thread_cascades = threading.local()
+        self._cascades()
         
         self.yolo_model = None
         if YOLO_AVAILABLE:
             print("[INFO] Loading YOLO...")
             try:
-                self.yolo_model = YOLO('yolov8n.pt')
+                self.yolo_model = _get_yolo()
                 print("[INFO] YOLO loaded")
             except Exception as e:
                 print(f"[WARNING] YOLO failed: {e}")
         
+        # (trained LBPH recognizer, label -> name), replaced as one tuple.
+        # Loads and retrains build a new recognizer and swap it in, so
+        # predict() never runs on a recognizer that is being trained.
+        self._model: Optional[Tuple[cv2.face.LBPHFaceRecognizer, Dict[int, str]]] = None
+        self._train_lock = threading.Lock()  # One load/retrain at a time
+        self._cache_stamp: Optional[int] = None  # Of the model cache we hold
+        
+        DATA_FACE_DIR.mkdir(parents=True, exist_ok=True)
+        MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        VIDEO_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # load=False for callers that retrain straight away anyway
+        if load:
+            self.load_model()
+    
+    @property
+    def is_trained(self) -> bool:
+        return self._model is not None
+    
+    @property
+    def known_face_labels(self) -> Dict[int, str]:
+        model = self._model
+        return model[1] if model is not None else {}
+    
+    @staticmethod
+    def _create_recognizer() -> cv2.face.LBPHFaceRecognizer:
         # Enterprise-level LBPH with optimal parameters for all lighting conditions
-        self.recognizer = cv2.face.LBPHFaceRecognizer_create(
+        return cv2.face.LBPHFaceRecognizer_create(
             radius=2,          # Increased for better texture capture
             neighbors=16,      # More neighbors for robust features  
             grid_x=10,         # Finer grid for better details
             grid_y=10,
             threshold=120.0    # Lower threshold for stricter matching
         )
-        self.is_trained = False
-        
-        DATA_FACE_DIR.mkdir(parents=True, exist_ok=True)
-        MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-        VIDEO_DIR.mkdir(parents=True, exist_ok=True)
-        
-        self.load_model()
+    
+    def _cascades(self) -> threading.local:
+        """This thread's Haar cascades, loaded on first use in the thread."""
+        local = self._thread_cascades
+        if not hasattr(local, 'face'):
+            local.face = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            )
+            local.alt = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_alt2.xml'
+            )
+        return local
+    
+    @property
+    def face_cascade(self) -> cv2.CascadeClassifier:
+        return self._cascades().face
+    
+    @property
+    def alt_cascade(self) -> cv2.CascadeClassifier:
+        return self._cascades().alt
     
     def preprocess_face(self, face_roi: np.ndarray) -> np.ndarray:
         """Enterprise-level preprocessing for 100/100 recognition in all conditions"""
@@ -111,16 +418,10 @@ class FaceDetector:
         face = clahe.apply(face)
         
         # Step 3: Gamma correction for night/low-light enhancement
-        gamma = 1.2  # Brightening factor
-        inv_gamma = 1.0 / gamma
-        table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in np.arange(0, 256)]).astype("uint8")
-        face = cv2.LUT(face, table)
+        face = cv2.LUT(face, GAMMA_LUT)
         
         # Step 4: Sharpen image (compensate for low-quality cameras)
-        kernel = np.array([[-1, -1, -1],
-                           [-1,  9, -1],
-                           [-1, -1, -1]])
-        face = cv2.filter2D(face, -1, kernel)
+        face = cv2.filter2D(face, -1, SHARPEN_KERNEL)
         
         # Step 5: Final equalization
         face = cv2.equalizeHist(face)
@@ -128,13 +429,19 @@ class FaceDetector:
         return face
     
     def load_model(self) -> bool:
+        with self._train_lock:
+            return self._load_model()
+    
+    def _load_model(self) -> bool:
         model_path = MODEL_CACHE_DIR / "lbph_model.yml"
-        labels_path = MODEL_CACHE_DIR / "labels.pkl"
-        hashes_path = MODEL_CACHE_DIR / "folder_hashes.pkl"
+        labels_path = MODEL_CACHE_DIR / "labels.json"
+        hashes_path = MODEL_CACHE_DIR / "folder_hashes.json"
+        # Taken before reading: a save that lands mid-load is picked up next time
+        self._cache_stamp = _cache_stamp()
         
         if hashes_path.exists():
-            with open(hashes_path, 'rb') as f:
-                cached = pickle.load(f)
+            with open(hashes_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
                 if isinstance(cached, dict) and "hashes" in cached:
                     if cached.get("version") == MODEL_VERSION:
                         self.folder_hashes = cached.get("hashes", {})
@@ -146,9 +453,7 @@ class FaceDetector:
         current_folders = {}
         changed = []
         
-        for folder in DATA_FACE_DIR.iterdir():
-            if not folder.is_dir() or folder.name.startswith('unknown'):
-                continue
+        for folder in _person_folders():
             h = get_folder_hash(folder)
             current_folders[folder.name] = h
             if folder.name not in self.folder_hashes or self.folder_hashes[folder.name] != h:
@@ -161,12 +466,13 @@ class FaceDetector:
         if not changed and model_path.exists() and labels_path.exists():
             print("[INFO] No changes, loading cache...")
             try:
-                self.recognizer.read(str(model_path))
-                with open(labels_path, 'rb') as f:
-                    d = pickle.load(f)
-                self.known_face_labels = d['labels']
+                recognizer = self._create_recognizer()
+                recognizer.read(str(model_path))
+                with open(labels_path, 'r', encoding='utf-8') as f:
+                    d = json.load(f)
+                # JSON object keys are strings; labels are LBPH ints
+                self._model = (recognizer, {int(k): v for k, v in d['labels'].items()})
                 self.label_counter = d['counter']
-                self.is_trained = True
                 print(f"[INFO] Loaded {len(self.known_face_labels)} persons")
                 return True
             except Exception:
@@ -176,78 +482,125 @@ class FaceDetector:
             print(f"[INFO] {len(changed)} folder(s) changed")
         return self._train_all(current_folders)
     
+    def _load_training_face(self, path: str) -> Optional[np.ndarray]:
+        """Read one training image and return its preprocessed face, or None."""
+        try:
+            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                return None
+            rects = self.face_cascade.detectMultiScale(img, 1.1, 3, minSize=(20, 20))
+            if len(rects) > 0:
+                x, y, w, h = max(rects, key=lambda r: r[2]*r[3])
+                roi = img[y:y+h, x:x+w]
+            else:
+                roi = img
+            return self.preprocess_face(roi)
+        except Exception:
+            return None
+    
     def _train_all(self, hashes: Dict[str, str]) -> bool:
-        self.known_face_labels = {}
-        self.label_counter = 0
+        # Built aside and swapped in at the end; verifications running
+        # meanwhile keep using the previous model
+        known_face_labels = {}
+        label_counter = 0
         faces = []
         labels = []
         name_to_label = {}
+        items = []  # (folder name, label, image path)
         
-        for folder in DATA_FACE_DIR.iterdir():
-            if not folder.is_dir() or folder.name.startswith('unknown'):
-                continue
-            
+        for folder in _person_folders():
             name = folder.name.replace('_', ' ').title()
             if name not in name_to_label:
-                name_to_label[name] = self.label_counter
-                self.known_face_labels[self.label_counter] = name
-                self.label_counter += 1
+                name_to_label[name] = label_counter
+                known_face_labels[label_counter] = name
+                label_counter += 1
             
             label = name_to_label[name]
-            count = 0
-            
-            for img_path in folder.iterdir():
-                if img_path.suffix.lower() not in ['.jpg', '.jpeg', '.png']:
-                    continue
-                try:
-                    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
-                    if img is None:
-                        continue
-                    rects = self.face_cascade.detectMultiScale(img, 1.1, 3, minSize=(20, 20))
-                    if len(rects) > 0:
-                        x, y, w, h = max(rects, key=lambda r: r[2]*r[3])
-                        roi = img[y:y+h, x:x+w]
-                    else:
-                        roi = img
-                    faces.append(self.preprocess_face(roi))
-                    labels.append(label)
-                    count += 1
-                except Exception:
-                    pass
-            
-            if count > 0:
-                print(f"[INFO] {folder.name}: {count} images")
-        
-        if faces:
-            self.recognizer.train(faces, np.array(labels))
-            self.is_trained = True
-            print(f"[TRAINED] {len(faces)} faces, {len(name_to_label)} persons")
-            self._save_cache(hashes)
-            return True
-        return False
+            items.extend((folder.name, label, img.path) for img in _training_images(folder))
+        
+        # imread, Haar and preprocessing release the GIL, so images load on
+        # every core; map keeps results in item order
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="face-train") as pool:
+            loaded = list(pool.map(self._load_training_face, [path for _, _, path in items]))
+        
+        counts = {}
+        for (folder_name, label, _), face in zip(items, loaded):
+            if face is None:
+                continue
+            faces.append(face)
+            labels.append(label)
+            counts[folder_name] = counts.get(folder_name, 0) + 1
+        for folder_name, count in counts.items():
+            print(f"[INFO] {folder_name}: {count} images")
+        
+        if not faces:
+            # Nothing left to recognize (the old labels no longer apply)
+            self._model = None
+            self.label_counter = 0
+            return False
+        
+        recognizer = self._create_recognizer()
+        recognizer.train(faces, np.array(labels))
+        self._model = (recognizer, known_face_labels)
+        self.label_counter = label_counter
+        print(f"[TRAINED] {len(faces)} faces, {len(name_to_label)} persons")
+        self._save_cache(hashes)
+        return True
     
     def _save_cache(self, hashes):
         try:
-            self.recognizer.save(str(MODEL_CACHE_DIR / "lbph_model.yml"))
-            with open(MODEL_CACHE_DIR / "labels.pkl", 'wb') as f:
-                pickle.dump({'labels': self.known_face_labels, 'counter': self.label_counter}, f)
-            with open(MODEL_CACHE_DIR / "folder_hashes.pkl", 'wb') as f:
-                pickle.dump({"version": MODEL_VERSION, "hashes": hashes}, f)
+            recognizer, known_face_labels = self._model
+            model_path = MODEL_CACHE_DIR / "lbph_model.yml"
+            tmp = _temp_path(model_path)
+            recognizer.save(str(tmp))
+            os.replace(tmp, model_path)
+            _write_json_atomic(MODEL_CACHE_DIR / "labels.json",
+                               {'labels': known_face_labels, 'counter': self.label_counter})
+            # Hashes go last: they mark the model and labels as current
+            _write_json_atomic(MODEL_CACHE_DIR / "folder_hashes.json",
+                               {"version": MODEL_VERSION, "hashes": hashes})
             self.folder_hashes = hashes
+            self._cache_stamp = _cache_stamp()
         except Exception:
             pass
     
+    def reload_if_stale(self) -> bool:
+        """
+        Reload the model if another process saved a newer one; True if reloaded.
+        
+        Each Uvicorn worker holds its own model, and only the worker that
+        handled /register retrains it; the others pick it up from the cache
+        here. Callers that find a load or retrain in progress keep using the
+        current model instead of waiting for it.
+        """
+        if _cache_stamp() == self._cache_stamp:
+            return False
+        if not self._train_lock.acquire(blocking=False):
+            return False
+        try:
+            if _cache_stamp() == self._cache_stamp:
+                return False
+            print("[INFO] Model cache updated by another process, reloading...")
+            self._load_model()
+            return True
+        finally:
+            self._train_lock.release()
+    
     def force_retrain(self):
-        hashes = {}
-        for folder in DATA_FACE_DIR.iterdir():
-            if folder.is_dir() and not folder.name.startswith('unknown'):
-                hashes[folder.name] = get_folder_hash(folder)
-        self._train_all(hashes)
-    
-    def detect_faces_fast(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Enterprise detection with low-light and night vision support"""
-        scale = self.detection_scale
-        small = cv2.resize(frame, None, fx=scale, fy=scale)
+        with self._train_lock:
+            hashes = {folder.name: get_folder_hash(folder) for folder in _person_folders()}
+            self._train_all(hashes)
+    
+    def detect_faces_fast(self, frame: np.ndarray, scale: Optional[float] = None) -> List[Tuple[int, int, int, int]]:
+        """Enterprise detection with low-light and night vision support.
+        
+        `scale` overrides detection_scale, e.g. for frames already decoded at reduced size.
+        Either way the frame is detected at no more than DETECTION_MAX_SIDE pixels.
+        """
+        scale = self.detection_scale if scale is None else scale
+        scale = min(scale, DETECTION_MAX_SIDE / max(frame.shape[:2]))
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=interpolation)
         gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
         
         # Advanced preprocessing for low-light detection
@@ -259,20 +612,23 @@ class FaceDetector:
         all_faces = []
         
         if self.yolo_model:
-            results = self.yolo_model(small, verbose=False, classes=[0], conf=0.5)
-            for r in results:
-                for box in r.boxes:
-                    px1, py1, px2, py2 = map(int, box.xyxy[0])
-                    px1, py1 = max(0, px1), max(0, py1)
-                    px2, py2 = min(small.shape[1], px2), min(small.shape[0], py2)
-                    if px2 <= px1 or py2 <= py1:
-                        continue
-                    person = gray[py1:py2, px1:px2]
-                    faces = self.face_cascade.detectMultiScale(person, 1.1, 4, minSize=(20, 20))
-                    if len(faces) == 0:
-                        faces = self.alt_cascade.detectMultiScale(person, 1.1, 4, minSize=(20, 20))
-                    for (fx, fy, fw, fh) in faces:
-                        all_faces.append((int((px1+fx)/scale), int((py1+fy)/scale), int(fw/scale), int(fh/scale)))
+            for box in _YOLO_BATCHER(self.yolo_model, small).boxes:
+                px1, py1, px2, py2 = map(int, box.xyxy[0])
+                px1, py1 = max(0, px1), max(0, py1)
+                px2, py2 = min(small.shape[1], px2), min(small.shape[0], py2)
+                if px2 <= px1 or py2 <= py1:
+                    continue
+                person = gray[py1:py2, px1:px2]
+                crop_scale = min(1.0, PERSON_MAX_SIDE / max(person.shape))
+                if crop_scale < 1:
+                    person = cv2.resize(person, None, fx=crop_scale, fy=crop_scale,
+                                        interpolation=cv2.INTER_AREA)
+                faces = self.face_cascade.detectMultiScale(person, 1.1, 4, minSize=(20, 20))
+                if len(faces) == 0:
+                    faces = self.alt_cascade.detectMultiScale(person, 1.1, 4, minSize=(20, 20))
+                for face in faces:
+                    fx, fy, fw, fh = (v / crop_scale for v in face)
+                    all_faces.append((int((px1+fx)/scale), int((py1+fy)/scale), int(fw/scale), int(fh/scale)))
         
         if not all_faces:
             faces = self.face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(30, 30))
@@ -286,8 +642,23 @@ class FaceDetector:
         """Enterprise recognition with multi-attempt strategy for 100% reliability"""
         if not self.is_trained:
             return "Unknown", 0.0, 999.0
+        # Only the padded face box (see recognize_face_gray) is converted to
+        # grayscale, not the whole frame
+        x, y, w, h = rect
+        pad = int(min(w, h) * 0.05)
+        x1, y1 = max(0, x - pad), max(0, y - pad)
+        crop = frame[y1:y1 + h + 2*pad, x1:x1 + w + 2*pad]
+        if crop.size == 0:
+            return "Unknown", 0.0, 999.0
+        return self.recognize_face_gray(cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY), (x - x1, y - y1, w, h))
+    
+    def recognize_face_gray(self, gray, rect) -> Tuple[str, float, float]:
+        """`recognize_face` on a frame already converted to grayscale."""
+        model = self._model  # One snapshot, even if a retrain swaps in a new one
+        if model is None:
+            return "Unknown", 0.0, 999.0
+        recognizer, known_face_labels = model
         x, y, w, h = rect
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         # Add padding for better context (5% on each side)
         pad = int(min(w, h) * 0.05)
@@ -305,13 +676,13 @@ class FaceDetector:
         best_dist = 999.0
         
         try:
-            label, dist = self.recognizer.predict(roi)
+            label, dist = recognizer.predict(roi)
             # Enhanced confidence calculation for enterprise accuracy
             conf = max(0, min(100, 100 - dist * 0.85))  # More sensitive to distance
             
             # Accept if within threshold
             if dist <= self.max_distance:
-                best_name = self.known_face_labels.get(label, "Unknown")
+                best_name = known_face_labels.get(label, "Unknown")
                 best_conf = conf
                 best_dist = dist
                 
@@ -398,7 +769,7 @@ class FaceDetector:
         
         print("[RECORDING] Started! Move your head around...")
         
-        start_time = time.time()
+        start_time = time.monotonic()
         frame_count = 0
         
         while True:
@@ -406,7 +777,7 @@ class FaceDetector:
             if not ret:
                 break
             
-            elapsed = time.time() - start_time
+            elapsed = time.monotonic() - start_time
             remaining = max(0, duration - elapsed)
             
             if elapsed >= duration:
@@ -468,6 +839,9 @@ class FaceDetector:
         
         extracted = 0
         idx = 0
+        # JPEG encode + write happen on a writer thread so they overlap with
+        # decoding/detecting the next frames; shut down before returning
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-writer")
         
         while True:
             ret, frame = cap.read()
@@ -494,7 +868,8 @@ class FaceDetector:
                     blur = cv2.Laplacian(gray, cv2.CV_64F).var()
                     
                     if blur > 50:
-                        cv2.imwrite(str(folder / f"{img_num}.jpg"), face_img)
+                        # Copy: the crop is a view of frame, which is drawn on below
+                        writer.submit(cv2.imwrite, str(folder / f"{img_num}.jpg"), face_img.copy())
                         extracted += 1
                         img_num += 1
                         cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
@@ -507,6 +882,8 @@ class FaceDetector:
             if cv2.waitKey(1) & 0xFF == ord('q') or extracted >= max_frames:
                 break
         
+        # Every image must be on disk before the caller retrains
+        writer.shutdown(wait=True)
         cap.release()
         cv2.destroyWindow("Extracting")
         
@@ -535,13 +912,18 @@ class FaceDetector:
         print(f"\n[CAPTURE] {person_name}")
         print("[INFO] SPACE=capture, Q=done\n")
         
+        # Preview boxes come from a background detector so the preview keeps camera FPS
+        live = LiveDetection(self, recognize=False)
+        grabber = FrameGrabber(cap)
+        
         while True:
-            ret, frame = cap.read()
+            ret, frame = grabber.read()
             if not ret:
                 break
             
             display = frame.copy()
-            faces = self.detect_faces_fast(frame)
+            live.submit(frame)
+            faces = live.results[0]
             
             for (x, y, w, h) in faces:
                 cv2.rectangle(display, (x, y), (x+w, y+h), (0, 255, 0), 2)
@@ -553,6 +935,10 @@ class FaceDetector:
             key = cv2.waitKey(1) & 0xFF
             
             if key == ord(' ') and faces:
+                # Preview boxes may be a frame or two old; crop from a fresh detection
+                faces = self.detect_faces_fast(frame)
+                if not faces:
+                    continue
                 x, y, w, h = max(faces, key=lambda r: r[2]*r[3])
                 pad = 30
                 H, W = frame.shape[:2]
@@ -565,7 +951,8 @@ class FaceDetector:
             elif key == ord('q'):
                 break
         
-        cap.release()
+        live.stop()
+        grabber.release()
         cv2.destroyWindow(window)
         return captured
     
@@ -599,7 +986,7 @@ class FaceDetector:
         cv2.namedWindow(window, cv2.WINDOW_NORMAL)
         cv2.resizeWindow(window, 800, 600)
         
-        fps_start = time.time()
+        fps_start = time.monotonic()
         fps_count = 0
         fps = 0
         
@@ -608,16 +995,23 @@ class FaceDetector:
         input_text = ""
         input_action = ""  # "record", "capture", "video"
         
+        # Detection runs off the UI thread so the preview keeps camera FPS;
+        # trackers keep its (slightly older) boxes on the faces in between
+        live = LiveDetection(self)
+        tracks = FaceTracks()
+        # Camera reads on their own thread; the loop always gets the newest frame
+        grabber = FrameGrabber(cap)
+        
         while True:
-            ret, frame = cap.read()
+            ret, frame = grabber.read()
             if not ret:
                 break
             
             fps_count += 1
-            if time.time() - fps_start >= 1.0:
+            if time.monotonic() - fps_start >= 1.0:
                 fps = fps_count
                 fps_count = 0
-                fps_start = time.time()
+                fps_start = time.monotonic()
             
             display = frame.copy()
             
@@ -638,8 +1032,8 @@ class FaceDetector:
                 # Detection
                 self.frame_count += 1
                 if self.frame_count % self.skip_frames == 0:
-                    self.cached_faces = self.detect_faces_fast(frame)
-                    self.cached_results = [self.recognize_face(frame, r) for r in self.cached_faces]
+                    live.submit(frame)
+                self.cached_faces, self.cached_results = tracks.update(frame, live.detection)
                 
                 for i, (x, y, w, h) in enumerate(self.cached_faces):
                     if i < len(self.cached_results):
@@ -669,7 +1063,7 @@ class FaceDetector:
                     if input_text.strip():
                         name = input_text.strip()
                         cv2.destroyWindow(window)
-                        cap.release()
+                        grabber.release()
                         
                         if input_action == "record":
                             # Ask for duration
@@ -704,6 +1098,7 @@ class FaceDetector:
                         if not cap.isOpened():
                             cap = cv2.VideoCapture(camera_index)
                         cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                        grabber = FrameGrabber(cap)
                         cv2.namedWindow(window, cv2.WINDOW_NORMAL)
                         cv2.resizeWindow(window, 800, 600)
                     
@@ -731,7 +1126,8 @@ class FaceDetector:
                     input_text = ""
                     input_action = "video"
         
-        cap.release()
+        live.stop()
+        grabber.release()
         cv2.destroyAllWindows()
         print("[INFO] Done")
 
@@ -745,9 +1141,9 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1:
         if sys.argv[1] == "--list":
-            for f in sorted(DATA_FACE_DIR.iterdir()):
-                if f.is_dir() and not f.name.startswith('unknown'):
-                    print(f"  {f.name}: {len(list(f.glob('*.jpg')))} images")
+            # Listing only; no detector, cascades or LBPH needed
+            for f in sorted(_person_folders(), key=lambda e: e.name):
+                print(f"  {f.name}: {len(_training_images(f))} images")
             sys.exit(0)
         elif sys.argv[1] == "--record" and len(sys.argv) >= 3:
             d = FaceDetector()
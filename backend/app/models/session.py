@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Optional
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, SmallIntEnum, utc_now
 
 
 class SessionStatus(str, enum.Enum):
@@ -19,6 +19,14 @@ class SessionStatus(str, enum.Enum):
     ENDED = "ended"          # Closed, no more attendance
 
 
+# Stored SMALLINT codes; the model attribute keeps the plain string value
+SESSION_STATUS_CODES = {
+    SessionStatus.PENDING.value: 0,
+    SessionStatus.ACTIVE.value: 1,
+    SessionStatus.ENDED.value: 2,
+}
+
+
 class AttendanceSession(Base):
     """
     Represents a class session for attendance tracking.
@@ -41,13 +49,14 @@ class AttendanceSession(Base):
     
     # Lifecycle
     status: Mapped[str] = mapped_column(
-        String(20), 
+        SmallIntEnum(SESSION_STATUS_CODES.items()), 
         default=SessionStatus.PENDING.value,
-        nullable=False
+        nullable=False,
+        index=True
     )
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
@@ -65,13 +74,13 @@ class AttendanceSession(Base):
         """Transition session to active state"""
         if self.status == SessionStatus.PENDING.value:
             self.status = SessionStatus.ACTIVE.value
-            self.started_at = datetime.utcnow()
+            self.started_at = utc_now()
     
     def end(self):
         """Close the session"""
         if self.status == SessionStatus.ACTIVE.value:
             self.status = SessionStatus.ENDED.value
-            self.ended_at = datetime.utcnow()
+            self.ended_at = utc_now()
     
     @property
     def is_active(self) -> bool:
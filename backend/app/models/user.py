@@ -3,12 +3,11 @@ User Model
 Defines the User entity for authentication with strict RBAC
 """
 
-from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime, Enum as SQLEnum, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Integer, String
 
-from app.core.database import Base
+from app.core.database import Base, SmallIntEnum, utc_now
 
 
 class UserRole(str, Enum):
@@ -18,6 +17,14 @@ class UserRole(str, Enum):
     ADMIN = "ADMIN"
 
 
+# Stored SMALLINT codes; never renumber existing entries
+USER_ROLE_CODES = {
+    UserRole.STUDENT: 1,
+    UserRole.FACULTY: 2,
+    UserRole.ADMIN: 3,
+}
+
+
 class User(Base):
     """User model for authentication"""
     __tablename__ = "users"
@@ -27,9 +34,9 @@ class User(Base):
     email = Column(String(100), unique=True, index=True)
     full_name = Column(String(100))
     password_hash = Column(String(255), nullable=False)
-    role = Column(SQLEnum(UserRole, name="user_roles"), default=UserRole.STUDENT, nullable=False)
+    role = Column(SmallIntEnum(USER_ROLE_CODES.items()), default=UserRole.STUDENT, nullable=False, index=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
 
     def __repr__(self) -> str:
         return f"<User(username='{self.username}', role='{self.role}')>"
@@ -3,16 +3,10 @@ Authentication Schemas
 Pydantic models for authentication requests/responses
 """
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional
-from enum import Enum
 
-
-class UserRole(str, Enum):
-    """User role enumeration"""
-    STUDENT = "STUDENT"
-    FACULTY = "FACULTY"
-    ADMIN = "ADMIN"
+from app.models.user import UserRole
 
 
 class UserLogin(BaseModel):
@@ -39,8 +33,7 @@ class UserResponse(BaseModel):
     role: str
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CurrentUser(BaseModel):
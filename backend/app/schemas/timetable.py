@@ -2,7 +2,7 @@
 Pydantic Schemas for Timetable API Request/Response Validation
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 
@@ -20,8 +20,7 @@ class TeacherResponse(BaseModel):
     max_hours_per_day: int
     subjects: List[dict] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Room Schemas
 class RoomCreate(BaseModel):
@@ -37,8 +36,7 @@ class RoomResponse(BaseModel):
     is_lab: bool
     room_type: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Subject Schemas
 class SubjectCreate(BaseModel):
@@ -56,8 +54,7 @@ class SubjectResponse(BaseModel):
     requires_lab: bool
     teachers: List[dict] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # ClassGroup Schemas
 class ClassGroupCreate(BaseModel):
@@ -71,8 +68,7 @@ class ClassGroupResponse(BaseModel):
     semester: int
     strength: int
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Timetable Schemas
 class TimetableEntryResponse(BaseModel):
@@ -85,8 +81,7 @@ class TimetableEntryResponse(BaseModel):
     subject_code: str
     class_group_name: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class GenerateRequest(BaseModel):
     class_group_ids: Optional[List[int]] = None  # If None, generate for all
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, TypeAdapter
 
 from app.models.user import UserRole
 
@@ -28,14 +28,17 @@ class UserRead(BaseModel):
     is_active: bool
     created_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserListResponse(BaseModel):
     users: list[UserRead]
 
 
+# Compiled once; validates ORM rows and serializes the whole list in one pass
+USER_LIST_ADAPTER = TypeAdapter(list[UserRead])
+
+
 class UserDeleteResponse(BaseModel):
     message: str
     deleted_user_id: int
@@ -19,7 +19,9 @@ Privacy Compliance:
 
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, literal, select, true
+from app.core.database import SessionLocal, utc_now
+from app.core.logging import logger
 from app.models.attendance import AttendanceLog, Student
 from app.models.session import AttendanceSession
 import math
@@ -55,16 +57,38 @@ class AnomalyResult:
         }
 
 
+@dataclass
+class AnomalyContext:
+    """Per-student activity snapshot consumed by the DB-free scoring helpers."""
+    failed_count: int = 0
+    ip_failed: int = 0
+    distinct_ips: int = 0
+    last_lat: Optional[float] = None
+    last_lon: Optional[float] = None
+    last_ts: Optional[datetime] = None
+    # Failure counts came from LIMIT-capped subqueries (see _fetch_activity_counts)
+    bounded: bool = False
+
+
 # ==================== Configuration ====================
 # Campus Coordinates (Configurable per deployment)
 CAMPUS_LAT = 12.9716  # Example: Bangalore
 CAMPUS_LON = 77.5946
 MAX_DISTANCE_METERS = 500
 IMPOSSIBLE_SPEED_MPS = 42  # ~150 km/h
+EARTH_RADIUS_METERS = 6371000
+
+# Campus terms of the haversine formula, computed once
+_CAMPUS_PHI = math.radians(CAMPUS_LAT)
+_CAMPUS_LAM = math.radians(CAMPUS_LON)
+_COS_CAMPUS = math.cos(_CAMPUS_PHI)
 
 # Failed Attempts Thresholds
 MAX_FAILED_ATTEMPTS_WINDOW = 300  # 5 minutes
 MAX_FAILED_ATTEMPTS = 5
+# Single-log checks only need to know a threshold was crossed
+STUDENT_FAILED_COUNT_CAP = MAX_FAILED_ATTEMPTS + 1
+IP_FAILED_COUNT_CAP = MAX_FAILED_ATTEMPTS * 2 + 1
 
 # Risk Score Weights
 WEIGHTS = {
@@ -82,32 +106,48 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     if None in (lat1, lon1, lat2, lon2):
         return 0.0
         
-    R = 6371000  # Earth radius in meters
+    R = EARTH_RADIUS_METERS
     phi1, phi2 = math.radians(lat1), math.radians(lat2)
     delta_phi = math.radians(lat2 - lat1)
     delta_lambda = math.radians(lon2 - lon1)
 
     a = math.sin(delta_phi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    c = 2 * math.asin(math.sqrt(min(1.0, a)))
     
     return R * c
 
 
+def distance_from_campus(lat: float, lon: float) -> float:
+    """haversine_distance() from the campus, reusing the precomputed campus terms."""
+    phi2 = math.radians(lat)
+    delta_phi = phi2 - _CAMPUS_PHI
+    delta_lambda = math.radians(lon) - _CAMPUS_LAM
+
+    a = math.sin(delta_phi / 2)**2 + _COS_CAMPUS * math.cos(phi2) * math.sin(delta_lambda / 2)**2
+    c = 2 * math.asin(math.sqrt(min(1.0, a)))
+
+    return EARTH_RADIUS_METERS * c
+
+
 def hash_device_fingerprint(ip: str, user_agent: str = "") -> str:
-    """Create anonymous device fingerprint."""
+    """Create anonymous device fingerprint (16 hex chars)."""
     raw = f"{ip}:{user_agent}"
-    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+# Severity for every whole score 0..100, built once at import
+_LEVEL_LUT: tuple[RiskLevel, ...] = tuple(
+    RiskLevel.CRITICAL if s >= 70
+    else RiskLevel.HIGH if s >= 50
+    else RiskLevel.MEDIUM if s >= 25
+    else RiskLevel.LOW
+    for s in range(101)
+)
 
 
 def calculate_risk_level(score: float) -> RiskLevel:
     """Map risk score to severity level."""
-    if score >= 70:
-        return RiskLevel.CRITICAL
-    if score >= 50:
-        return RiskLevel.HIGH
-    if score >= 25:
-        return RiskLevel.MEDIUM
-    return RiskLevel.LOW
+    return _LEVEL_LUT[max(0, min(100, int(score)))]
 
 
 # ==================== Detection Functions ====================
@@ -117,7 +157,7 @@ def _check_location_anomaly(lat: Optional[float], lon: Optional[float]) -> tuple
     score = 0.0
     
     if lat is not None and lon is not None:
-        dist = haversine_distance(CAMPUS_LAT, CAMPUS_LON, lat, lon)
+        dist = distance_from_campus(lat, lon)
         if dist > MAX_DISTANCE_METERS:
             reasons.append(f"📍 Off-Campus Location ({int(dist)}m from campus)")
             # Score increases with distance
@@ -126,12 +166,11 @@ def _check_location_anomaly(lat: Optional[float], lon: Optional[float]) -> tuple
     return reasons, score
 
 
-def _check_time_anomaly(db: Session, session_id: int, timestamp: datetime) -> tuple[list[str], float]:
+def _check_time_anomaly(session: Optional[AttendanceSession], timestamp: datetime) -> tuple[list[str], float]:
     """Check for session timing violations."""
     reasons = []
     score = 0.0
     
-    session = db.query(AttendanceSession).get(session_id)
     if not session:
         return reasons, score
 
@@ -150,9 +189,17 @@ def _check_time_anomaly(db: Session, session_id: int, timestamp: datetime) -> tu
     return reasons, score
 
 
+def _find_last_log(db: Session, log: AttendanceLog) -> Optional[AttendanceLog]:
+    """The student's most recent other log, for the travel check."""
+    return db.query(AttendanceLog).filter(
+        AttendanceLog.student_id == log.student_id,
+        AttendanceLog.id != log.id
+    ).order_by(AttendanceLog.timestamp.desc()).first()
+
+
 def _check_behavioral_anomaly(
-    db: Session, 
     log: AttendanceLog, 
+    ctx: AnomalyContext,
     lat: Optional[float], 
     lon: Optional[float]
 ) -> tuple[list[str], float]:
@@ -160,19 +207,14 @@ def _check_behavioral_anomaly(
     reasons = []
     score = 0.0
     
-    last_log = db.query(AttendanceLog).filter(
-        AttendanceLog.student_id == log.student_id,
-        AttendanceLog.id != log.id
-    ).order_by(AttendanceLog.timestamp.desc()).first()
-    
-    if not (last_log and last_log.latitude and last_log.longitude and lat and lon):
+    if not (ctx.last_ts and ctx.last_lat and ctx.last_lon and lat and lon):
         return reasons, score
 
-    time_diff = abs((log.timestamp - last_log.timestamp).total_seconds())
+    time_diff = abs((log.timestamp - ctx.last_ts).total_seconds())
     if time_diff < 1:
         time_diff = 1  # Avoid division by zero
         
-    dist = haversine_distance(last_log.latitude, last_log.longitude, lat, lon)
+    dist = haversine_distance(ctx.last_lat, ctx.last_lon, lat, lon)
     speed_mps = dist / time_diff
     
     if speed_mps > IMPOSSIBLE_SPEED_MPS:
@@ -185,86 +227,230 @@ def _check_behavioral_anomaly(
     return reasons, score
 
 
-def _check_failed_attempts(
-    db: Session, 
+def _bounded_count(*criteria, limit: int):
+    """Scalar subquery counting matching logs, but never more than `limit`."""
+    matches = select(AttendanceLog.id).where(*criteria).limit(limit).subquery()
+    return select(func.count()).select_from(matches).scalar_subquery()
+
+
+def _fetch_activity_counts(
+    db: Session,
     student_id: Optional[int],
-    ip_address: Optional[str]
-) -> tuple[list[str], float]:
+    ip_address: Optional[str],
+    now: datetime,
+    exclude_log_id: Optional[int] = None
+) -> tuple[int, int, int]:
+    """
+    Fetch (failed_by_student, failed_by_ip, distinct_ips) in one round trip.
+    
+    The failure counts cover the brute-force window; the distinct IP count
+    covers the last hour and is only computed when both keys are known.
+    Failure counts stop one past their threshold (LIMIT inside the
+    subquery), so a flood of failures from one IP costs a bounded scan.
+    `exclude_log_id` keeps an already-persisted log from counting itself.
+    """
+    if not student_id and not ip_address:
+        return 0, 0, 0
+
+    failed_start = now - timedelta(seconds=MAX_FAILED_ATTEMPTS_WINDOW)
+    device_start = now - timedelta(hours=1)
+    # `== true()` renders as `is_failed = 1`, matching the partial index
+    # predicate; SQLite won't use idx_attendance_failed_student_ts for `IS 1`
+    common = [AttendanceLog.is_failed == true(), AttendanceLog.timestamp >= failed_start]
+    if exclude_log_id is not None:
+        common.append(AttendanceLog.id != exclude_log_id)
+
+    columns = [literal(0), literal(0), literal(0)]
+    if student_id:
+        columns[0] = _bounded_count(
+            AttendanceLog.student_id == student_id, *common,
+            limit=STUDENT_FAILED_COUNT_CAP
+        )
+    if ip_address:
+        columns[1] = _bounded_count(
+            AttendanceLog.ip_address == ip_address, *common,
+            limit=IP_FAILED_COUNT_CAP
+        )
+    if student_id and ip_address:
+        device_criteria = [
+            AttendanceLog.student_id == student_id,
+            AttendanceLog.timestamp >= device_start,
+            AttendanceLog.ip_address.isnot(None),
+        ]
+        if exclude_log_id is not None:
+            device_criteria.append(AttendanceLog.id != exclude_log_id)
+        columns[2] = select(
+            func.count(func.distinct(AttendanceLog.ip_address))
+        ).where(*device_criteria).scalar_subquery()
+
+    row = db.query(*columns).one()
+    return tuple(int(value or 0) for value in row)
+
+
+def _format_count(count: int, cap: int, bounded: bool) -> str:
+    """Render a count, marking capped values of a bounded count as lower bounds."""
+    return f"{count}+" if bounded and count >= cap else str(count)
+
+
+def compute_bulk_risk(
+    db: Session,
+    student_ids: list[int],
+    since: datetime,
+    now: Optional[datetime] = None
+) -> dict[int, AnomalyContext]:
+    """
+    Build AnomalyContext for many students with a single SQL statement.
+    
+    One CTE aggregates failure and distinct-IP counts per student, a second
+    picks each student's latest log since `since`; the two are joined
+    server-side. Per-IP failure counts are request-specific and stay 0 here.
+    """
+    if not student_ids:
+        return {}
+
+    now = now or datetime.now(timezone.utc)
+    failed_start = now - timedelta(seconds=MAX_FAILED_ATTEMPTS_WINDOW)
+    device_start = now - timedelta(hours=1)
+    ids = set(student_ids)
+
+    counts = select(
+        AttendanceLog.student_id.label("student_id"),
+        func.count().filter(
+            AttendanceLog.is_failed == true(),
+            AttendanceLog.timestamp >= failed_start
+        ).label("failed_count"),
+        func.count(func.distinct(AttendanceLog.ip_address)).filter(
+            AttendanceLog.ip_address.isnot(None)
+        ).label("distinct_ips"),
+    ).where(
+        AttendanceLog.student_id.in_(ids),
+        AttendanceLog.timestamp >= device_start
+    ).group_by(AttendanceLog.student_id).cte("counts")
+
+    ranked = select(
+        AttendanceLog.student_id.label("student_id"),
+        AttendanceLog.latitude.label("last_lat"),
+        AttendanceLog.longitude.label("last_lon"),
+        AttendanceLog.timestamp.label("last_ts"),
+        func.row_number().over(
+            partition_by=AttendanceLog.student_id,
+            order_by=AttendanceLog.timestamp.desc()
+        ).label("rn"),
+    ).where(
+        AttendanceLog.student_id.in_(ids),
+        AttendanceLog.timestamp >= since
+    ).cte("ranked")
+
+    students = select(AttendanceLog.student_id.label("student_id")).where(
+        AttendanceLog.student_id.in_(ids),
+        or_(AttendanceLog.timestamp >= since, AttendanceLog.timestamp >= device_start)
+    ).distinct().cte("students")
+
+    stmt = select(
+        students.c.student_id,
+        counts.c.failed_count,
+        counts.c.distinct_ips,
+        ranked.c.last_lat,
+        ranked.c.last_lon,
+        ranked.c.last_ts,
+    ).select_from(
+        students
+        .outerjoin(counts, counts.c.student_id == students.c.student_id)
+        .outerjoin(ranked, and_(ranked.c.student_id == students.c.student_id, ranked.c.rn == 1))
+    )
+
+    return {
+        row.student_id: AnomalyContext(
+            failed_count=row.failed_count or 0,
+            distinct_ips=row.distinct_ips or 0,
+            last_lat=row.last_lat,
+            last_lon=row.last_lon,
+            last_ts=row.last_ts,
+        )
+        for row in db.execute(stmt)
+    }
+
+
+def _check_failed_attempts(ctx: AnomalyContext) -> tuple[list[str], float]:
     """Detect repeated failed verification attempts (brute force)."""
     reasons = []
     score = 0.0
-    
-    window_start = datetime.now(timezone.utc) - timedelta(seconds=MAX_FAILED_ATTEMPTS_WINDOW)
+    failed_count, ip_failed = ctx.failed_count, ctx.ip_failed
     
     # Check by student
-    if student_id:
-        failed_count = db.query(AttendanceLog).filter(
-            AttendanceLog.student_id == student_id,
-            AttendanceLog.timestamp >= window_start,
-            AttendanceLog.status.like("%Rejected%") | AttendanceLog.status.like("%Failed%")
-        ).count()
-        
-        if failed_count >= MAX_FAILED_ATTEMPTS:
-            reasons.append(f"🔴 Repeated Failures ({failed_count} failed attempts in 5min)")
-            score = WEIGHTS["failed_attempts"]
-        elif failed_count >= 3:
-            reasons.append(f"🟡 Multiple Failures ({failed_count} failed attempts in 5min)")
-            score = WEIGHTS["failed_attempts"] * 0.5
+    if failed_count >= MAX_FAILED_ATTEMPTS:
+        reasons.append(
+            f"🔴 Repeated Failures ({_format_count(failed_count, STUDENT_FAILED_COUNT_CAP, ctx.bounded)} failed attempts in 5min)"
+        )
+        score = WEIGHTS["failed_attempts"]
+    elif failed_count >= 3:
+        reasons.append(f"🟡 Multiple Failures ({failed_count} failed attempts in 5min)")
+        score = WEIGHTS["failed_attempts"] * 0.5
     
     # Check by IP (device)
-    if ip_address:
-        ip_failed = db.query(AttendanceLog).filter(
-            AttendanceLog.ip_address == ip_address,
-            AttendanceLog.timestamp >= window_start,
-            AttendanceLog.status.like("%Rejected%") | AttendanceLog.status.like("%Failed%")
-        ).count()
-        
-        if ip_failed >= MAX_FAILED_ATTEMPTS * 2:
-            reasons.append(f"🔴 Device Abuse ({ip_failed} failures from same device)")
-            score = max(score, WEIGHTS["device"])
+    if ip_failed >= MAX_FAILED_ATTEMPTS * 2:
+        reasons.append(
+            f"🔴 Device Abuse ({_format_count(ip_failed, IP_FAILED_COUNT_CAP, ctx.bounded)} failures from same device)"
+        )
+        score = max(score, WEIGHTS["device"])
             
     return reasons, score
 
 
-def _check_device_anomaly(
-    db: Session,
-    student_id: Optional[int],
-    ip_address: Optional[str]
-) -> tuple[list[str], float]:
+def _check_device_anomaly(ctx: AnomalyContext) -> tuple[list[str], float]:
     """Detect multi-device abuse (same student, multiple IPs)."""
     reasons = []
     score = 0.0
+    unique_ips = ctx.distinct_ips
     
-    if not student_id or not ip_address:
-        return reasons, score
-    
-    window_start = datetime.now(timezone.utc) - timedelta(hours=1)
-    
-    unique_ips = db.query(func.count(func.distinct(AttendanceLog.ip_address))).filter(
-        AttendanceLog.student_id == student_id,
-        AttendanceLog.timestamp >= window_start,
-        AttendanceLog.ip_address.isnot(None)
-    ).scalar()
-    
-    if unique_ips and unique_ips >= 3:
+    if unique_ips >= 3:
         reasons.append(f"🔄 Multi-Device Activity ({unique_ips} devices in 1hr)")
         score = WEIGHTS["device"]
         
     return reasons, score
 
 
+def score_context(ctx: AnomalyContext) -> AnomalyResult:
+    """Score the student-level checks (failures, devices) from a prebuilt context."""
+    all_reasons = []
+    total_score = 0.0
+    recommendations = []
+
+    fail_reasons, fail_score = _check_failed_attempts(ctx)
+    all_reasons.extend(fail_reasons)
+    total_score += fail_score
+    if fail_reasons:
+        recommendations.append("Consider temporary account lockout")
+
+    device_reasons, device_score = _check_device_anomaly(ctx)
+    all_reasons.extend(device_reasons)
+    total_score += device_score
+    if device_reasons:
+        recommendations.append("Review device access patterns")
+
+    total_score = min(100, total_score)
+    return AnomalyResult(
+        is_anomaly=len(all_reasons) > 0,
+        risk_level=calculate_risk_level(total_score),
+        risk_score=round(total_score, 1),
+        reasons=all_reasons,
+        recommendations=recommendations
+    )
+
+
 # ==================== Main Detection Function ====================
 def detect_anomalies(
     db: Session, 
     log: AttendanceLog, 
     lat: Optional[float] = None, 
-    lon: Optional[float] = None
+    lon: Optional[float] = None,
+    session: Optional[AttendanceSession] = None
 ) -> list[str]:
     """
     Legacy function for backward compatibility.
     Returns list of anomaly reason strings.
     """
-    result = analyze_anomalies(db, log, lat, lon)
+    result = analyze_anomalies(db, log, lat, lon, session=session)
     return result.reasons
 
 
@@ -272,7 +458,8 @@ def analyze_anomalies(
     db: Session, 
     log: AttendanceLog, 
     lat: Optional[float] = None, 
-    lon: Optional[float] = None
+    lon: Optional[float] = None,
+    session: Optional[AttendanceSession] = None
 ) -> AnomalyResult:
     """
     Comprehensive anomaly analysis with risk scoring.
@@ -282,10 +469,13 @@ def analyze_anomalies(
     - Risk score (0-100)
     - Detailed reasons
     - Actionable recommendations
+    
+    Callers that already loaded the log's session should pass it as `session`.
     """
     all_reasons = []
     total_score = 0.0
     recommendations = []
+    now = datetime.now(timezone.utc)  # One clock for every time window below
     
     # 1. Location Anomaly
     loc_reasons, loc_score = _check_location_anomaly(lat, lon)
@@ -296,33 +486,37 @@ def analyze_anomalies(
     
     # 2. Time Anomaly
     if log.session_id:
-        time_reasons, time_score = _check_time_anomaly(db, log.session_id, log.timestamp)
+        if session is None or session.id != log.session_id:
+            session = db.get(AttendanceSession, log.session_id)
+        time_reasons, time_score = _check_time_anomaly(session, log.timestamp)
         all_reasons.extend(time_reasons)
         total_score += time_score
         if time_reasons:
             recommendations.append("Cross-check with session attendance records")
     
+    failed_count, ip_failed, unique_ips = _fetch_activity_counts(
+        db, log.student_id, log.ip_address, now, exclude_log_id=log.id
+    )
+    ctx = AnomalyContext(
+        failed_count=failed_count, ip_failed=ip_failed, distinct_ips=unique_ips, bounded=True
+    )
+    
     # 3. Behavioral Anomaly (Impossible Travel)
     if log.student_id:
-        travel_reasons, travel_score = _check_behavioral_anomaly(db, log, lat, lon)
+        last_log = _find_last_log(db, log)
+        if last_log:
+            ctx.last_lat, ctx.last_lon, ctx.last_ts = last_log.latitude, last_log.longitude, last_log.timestamp
+        travel_reasons, travel_score = _check_behavioral_anomaly(log, ctx, lat, lon)
         all_reasons.extend(travel_reasons)
         total_score += travel_score
         if travel_reasons:
             recommendations.append("Investigate possible credential sharing")
     
-    # 4. Failed Attempts
-    fail_reasons, fail_score = _check_failed_attempts(db, log.student_id, log.ip_address)
-    all_reasons.extend(fail_reasons)
-    total_score += fail_score
-    if fail_reasons:
-        recommendations.append("Consider temporary account lockout")
-    
-    # 5. Device Anomaly
-    device_reasons, device_score = _check_device_anomaly(db, log.student_id, log.ip_address)
-    all_reasons.extend(device_reasons)
-    total_score += device_score
-    if device_reasons:
-        recommendations.append("Review device access patterns")
+    # 4-5. Failed Attempts + Device Anomaly (same helpers as the bulk path)
+    student_result = score_context(ctx)
+    all_reasons.extend(student_result.reasons)
+    total_score += student_result.risk_score
+    recommendations.extend(student_result.recommendations)
     
     # Cap score at 100
     total_score = min(100, total_score)
@@ -336,3 +530,100 @@ def analyze_anomalies(
         recommendations=recommendations
     )
 
+
+# ==================== Split Request / Background Analysis ====================
+def analyze_critical_fast(
+    log: AttendanceLog,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    session: Optional[AttendanceSession] = None
+) -> AnomalyResult:
+    """
+    In-request checks that need no database access (location + session timing).
+    
+    The DB-backed checks run via analyze_in_request() or analyze_full_async().
+    """
+    all_reasons = []
+    total_score = 0.0
+    recommendations = []
+
+    loc_reasons, loc_score = _check_location_anomaly(lat, lon)
+    all_reasons.extend(loc_reasons)
+    total_score += loc_score
+    if loc_reasons:
+        recommendations.append("Verify student is physically present on campus")
+
+    if session is not None:
+        # Column default is applied at flush; score against "now" until then
+        timestamp = log.timestamp or utc_now()
+        time_reasons, time_score = _check_time_anomaly(session, timestamp)
+        all_reasons.extend(time_reasons)
+        total_score += time_score
+        if time_reasons:
+            recommendations.append("Cross-check with session attendance records")
+
+    total_score = min(100, total_score)
+    return AnomalyResult(
+        is_anomaly=len(all_reasons) > 0,
+        risk_level=calculate_risk_level(total_score),
+        risk_score=round(total_score, 1),
+        reasons=all_reasons,
+        recommendations=recommendations
+    )
+
+
+def analyze_in_request(
+    db: Session,
+    log: AttendanceLog,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    session: Optional[AttendanceSession] = None
+) -> tuple[AnomalyResult, bool]:
+    """
+    Anomaly checks to run before answering an attendance request.
+    
+    Returns (result, complete). A log the
+    DB-free checks already flag gets the full analysis inline (indexed,
+    capped lookups), recorded on the log, so a CRITICAL decision is made
+    before the response; the log is flushed for that. Otherwise `complete` is False and the
+    caller schedules analyze_full_async() for the committed log.
+    """
+    result = analyze_critical_fast(log, lat, lon, session=session)
+    if not result.is_anomaly:
+        return result, False
+
+    db.add(log)
+    db.flush()  # Assigns id and timestamp, so the log doesn't count itself
+    result = analyze_anomalies(db, log, lat, lon, session=session)
+    _store_result(log, result)
+    return result, True
+
+
+def _store_result(log: AttendanceLog, result: AnomalyResult) -> None:
+    """Record a full analysis on the log."""
+    log.is_anomaly = result.is_anomaly
+    log.anomaly_reason = ", ".join(result.reasons) if result.reasons else None
+    log.risk_score = result.risk_score
+    log.risk_level = result.risk_level.value
+
+
+def analyze_full_async(log_id: int) -> None:
+    """
+    Run the full analysis for a committed log and store the result on it.
+    
+    Meant to be scheduled off the request path (FastAPI BackgroundTasks);
+    opens its own DB session.
+    """
+    db = SessionLocal()
+    try:
+        log = db.get(AttendanceLog, log_id)
+        if log is None:
+            return
+
+        _store_result(log, analyze_anomalies(db, log, log.latitude, log.longitude))
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.error(f"Background anomaly analysis failed for log {log_id}: {exc}")
+    finally:
+        db.close()
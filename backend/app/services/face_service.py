@@ -6,7 +6,14 @@ This file defines the `FaceService` class, which acts as a singleton service lay
 between the FastAPI backend and the face recognition model (`FaceDetector`).
 
 Key Responsibilities:
-- Initialize a single global instance of `FaceDetector` (singleton pattern).
+- Lazily initialize a single global instance of `FaceDetector` (singleton pattern)
+  on first use, so importing the module stays cheap.
+- Provide `verify_students_batch(frames)` to verify several frames of one capture
+  in parallel, returning one `verify_student` result per frame, in order
+  (`iter_verify_students` streams the same results so callers can stop early).
+- Keep a small LRU of results keyed by a hash of the frame bytes, so re-sent or
+  duplicated frames skip decode/detect/recognize; cleared on retrain.
+- Reload the model when another worker process has retrained and saved it.
 - Provide the `verify_student(frame_bytes)` method to process raw camera frame bytes:
     * Convert image bytes into an OpenCV-compatible format.
     * Detect faces in the frame using the detector.
@@ -29,38 +36,123 @@ to the recognition logic, enabling intelligent student attendance verification.
 
 import sys
 import os
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
 import cv2
 import numpy as np
 from app.models.face_model import FaceDetector
 
+# JPEGs are decoded at 1/2 size by libjpeg (DCT-domain scaling) when the
+# result is still large enough for LBPH; detection runs at the same pixel
+# budget as before (0.6 of full == 1.2 of half).
+DECODE_REDUCTION = 2
+MIN_REDUCED_SIDE = 360
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(height, width) from a JPEG SOF or PNG IHDR header, without decoding."""
+    if data[:8] == PNG_SIGNATURE and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return height, width
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # Markers without a length
+            i += 2
+            continue
+        # SOF0..SOF15 carry the frame size; C4/C8/CC share the range but don't
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return height, width
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+# Decode, detection and LBPH all release the GIL; one worker per core is
+# shared by every batch call.
+BATCH_WORKERS = os.cpu_count() or 4
+_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="face-batch")
+
+# Identical uploads (client retries, a static camera) hit this instead of LBPH
+RESULT_CACHE_SIZE = 256
+
+
 class FaceService:
     _instance = None
     _detector = None
+    _init_lock = threading.Lock()
+    _results = OrderedDict()
+    _results_lock = threading.Lock()
+    _results_generation = 0
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(FaceService, cls).__new__(cls)
             print("[INFO] Initializing FaceService Singleton...")
-            # Enterprise parameters: tighter thresholds, better accuracy
-            cls._detector = FaceDetector(
-                max_distance=50.0,      # Stricter matching
-                detection_scale=0.6,
-                skip_frames=1,
-                min_confidence=50.0     # Lowered to handle low-light scenarios
-            )
         return cls._instance
 
+    @property
+    def detector(self) -> FaceDetector:
+        """
+        Build the FaceDetector on first use.
+        
+        Deferred so importing this module (and forking Uvicorn workers) doesn't
+        load cascades/YOLO or train LBPH until a request actually needs it.
+        """
+        if FaceService._detector is None:
+            with FaceService._init_lock:
+                if FaceService._detector is None:
+                    # Enterprise parameters: tighter thresholds, better accuracy
+                    FaceService._detector = FaceDetector(
+                        max_distance=50.0,      # Stricter matching
+                        detection_scale=0.6,
+                        skip_frames=1,
+                        min_confidence=50.0     # Lowered to handle low-light scenarios
+                    )
+        return FaceService._detector
+
     def verify_student(self, frame_bytes: bytes) -> dict:
         """
         Verify student from camera frame bytes.
         Returns dictionary with verification results.
         """
         print(f"[DEBUG] FaceService.verify_student called with {len(frame_bytes)} bytes")
+        self._sync_model()
+        key = self._frame_key(frame_bytes)
+        with FaceService._results_lock:
+            cached = FaceService._results.get(key)
+            if cached is not None:
+                FaceService._results.move_to_end(key)
+                return dict(cached)
+            generation = FaceService._results_generation
+
+        result = self._verify_uncached(frame_bytes)
+        # Errors may be transient (e.g. a failed retrain); don't pin them
+        if result["status"] != "error":
+            with FaceService._results_lock:
+                if generation != FaceService._results_generation:
+                    return result  # A retrain finished while we were verifying
+                FaceService._results[key] = dict(result)
+                if len(FaceService._results) > RESULT_CACHE_SIZE:
+                    FaceService._results.popitem(last=False)
+        return result
+
+    def _verify_uncached(self, frame_bytes: bytes) -> dict:
         try:
-            # Convert bytes to numpy array
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            frame, reduction = self._decode(frame_bytes)
             
             if frame is None:
                 return {"error": "Could not decode image", "status": "error"}
@@ -68,7 +160,9 @@ class FaceService:
             # Run detection
             # Note: recognize_face returns (name, confidence, distance)
             # We need to find the face first
-            face_rects = self._detector.detect_faces_fast(frame)
+            face_rects = self.detector.detect_faces_fast(
+                frame, scale=self.detector.detection_scale * reduction
+            )
             
             if not face_rects:
                 return {
@@ -86,7 +180,7 @@ class FaceService:
             
             # Single face case
             face_rect = face_rects[0]
-            name, confidence, distance = self._detector.recognize_face(frame, face_rect)
+            name, confidence, distance = self.detector.recognize_face(frame, face_rect)
             
             is_match = name != "Unknown"
             
@@ -96,20 +190,111 @@ class FaceService:
                 "student_name": name if is_match else None,
                 "confidence": confidence,
                 "distance": distance,
-                "face_rect": face_rect
+                # Report the box in the coordinates of the uploaded image
+                "face_rect": tuple(v * reduction for v in face_rect)
             }
 
         except Exception as e:
             print(f"[ERROR] Face verification failed: {e}")
             return {"status": "error", "message": str(e)}
 
+    def verify_students_batch(self, frames: List[bytes]) -> List[dict]:
+        """
+        Verify several frames at once; results are in the same order as frames.
+
+        LBPH has no batched predict, so the batch is spread over the worker
+        threads instead of stacked into one call.
+        """
+        return list(self.iter_verify_students(frames))
+
+    def iter_verify_students(self, frames: List[bytes]) -> Iterator[dict]:
+        """
+        Yield `verify_student` results in frame order as they complete.
+
+        Closing the iterator early cancels the frames still queued.
+        """
+        # Identical frames in one capture are verified once
+        unique = list(dict.fromkeys(frames))
+        if len(unique) <= 1:
+            results = map(self.verify_student, unique)
+        else:
+            # Build the detector here so workers don't race to train it
+            self.detector
+            results = _BATCH_EXECUTOR.map(self.verify_student, unique)
+        done = {}
+        try:
+            for frame_bytes in frames:
+                if frame_bytes not in done:
+                    done[frame_bytes] = next(results)
+                yield dict(done[frame_bytes])
+        finally:
+            if hasattr(results, "close"):
+                results.close()  # Executor.map cancels its pending futures
+
+    def _sync_model(self) -> None:
+        """Pick up a model another worker process retrained (e.g. after /register)."""
+        detector = FaceService._detector
+        if detector is not None and detector.reload_if_stale():
+            self._clear_results()
+
+    @staticmethod
+    def _clear_results() -> None:
+        # Cached results were produced by the previous model
+        with FaceService._results_lock:
+            FaceService._results.clear()
+            FaceService._results_generation += 1
+
+    @staticmethod
+    def _frame_key(frame_bytes: bytes) -> bytes:
+        return hashlib.blake2b(frame_bytes, digest_size=16).digest()
+
+    @staticmethod
+    def _decode(frame_bytes: bytes) -> tuple:
+        """
+        Decode an image exactly once, at reduced size when it is large enough.
+        
+        The size comes from the JPEG/PNG header, so webcam-sized (480p) frames
+        go straight to a full decode. Images whose header can't be read are
+        decoded at full size rather than tried reduced first.
+        Returns (frame, reduction).
+        """
+        nparr = np.frombuffer(frame_bytes, np.uint8)
+        size = image_size(frame_bytes)
+        if size is not None and min(size) // DECODE_REDUCTION >= MIN_REDUCED_SIDE:
+            return cv2.imdecode(nparr, cv2.IMREAD_REDUCED_COLOR_2), DECODE_REDUCTION
+        return cv2.imdecode(nparr, cv2.IMREAD_COLOR), 1
+
+    def warm_up(self) -> None:
+        """
+        Train/load LBPH and run a throwaway detection on every batch worker,
+        so the first real request doesn't pay for training, per-thread
+        cascade loading or OpenCV's lazy initialisation.
+        """
+        detector = self.detector
+        blank = np.zeros((MIN_REDUCED_SIDE, MIN_REDUCED_SIDE, 3), np.uint8)
+        detector.detect_faces_fast(blank)
+        # A thread blocked on the barrier can't pick up another task, so each
+        # of the BATCH_WORKERS tasks lands on a different worker thread
+        barrier = threading.Barrier(BATCH_WORKERS)
+
+        def warm_worker(_):
+            barrier.wait()
+            detector.detect_faces_fast(blank)
+
+        list(_BATCH_EXECUTOR.map(warm_worker, range(BATCH_WORKERS)))
+
     def retrain_model(self) -> None:
         """Force retraining from the face data folders."""
         try:
-            if self._detector:
-                self._detector.force_retrain()
+            if FaceService._detector is None:
+                # First build loads the cache and retrains changed folders
+                self.detector
+            else:
+                FaceService._detector.force_retrain()
         except Exception as exc:
             print(f"[WARNING] Failed to retrain model: {exc}")
+        finally:
+            self._clear_results()
 
 # Global instance
 face_service = FaceService()
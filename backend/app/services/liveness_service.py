@@ -16,8 +16,11 @@ For production, consider:
 
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional
+import os
+from typing import Iterator, List, Tuple, Optional, Union
 from dataclasses import dataclass
+import queue
+import threading
 import time
 
 from app.core.config_thresholds import thresholds
@@ -25,29 +28,81 @@ from app.core.logging import logger
 
 # Try to import mediapipe for landmarks (fallback to simulation if unavailable)
 LANDMARKS_AVAILABLE = False
-FACE_MESH = None
 
 try:
     import mediapipe as mp
 
-    FACE_MESH = mp.solutions.face_mesh.FaceMesh(
-        static_image_mode=True,
-        max_num_faces=1,
-        refine_landmarks=True,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-    )
+    _FaceMesh = mp.solutions.face_mesh.FaceMesh
     LANDMARKS_AVAILABLE = True
-    logger.info("MediaPipe FaceMesh loaded for liveness detection")
+    logger.info("MediaPipe FaceMesh available for liveness detection")
 except Exception as e:
     logger.info(f"MediaPipe not available: {e}. Liveness detection will be simulated.")
 
+# One FaceMesh graph per thread, built on first use. A shared graph serializes
+# concurrent requests, and MediaPipe graphs must not cross a fork.
+_face_meshes = threading.local()
+
+
+def _reset_face_meshes() -> None:
+    global _face_meshes
+    _face_meshes = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    # Workers forked from a preloaded app build their own graphs
+    os.register_at_fork(after_in_child=_reset_face_meshes)
+
+
+def get_face_mesh():
+    """Return this thread's FaceMesh, creating it on first use (None if unavailable)."""
+    if not LANDMARKS_AVAILABLE:
+        return None
+    mesh = getattr(_face_meshes, "mesh", None)
+    if mesh is None:
+        mesh = _FaceMesh(
+            static_image_mode=True,
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+        )
+        _face_meshes.mesh = mesh
+    return mesh
+
+# libjpeg-turbo decodes straight to RGB; fall back to OpenCV if it isn't installed
+_TJ = None
+TJPF_RGB = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+
+    _TJ = TurboJPEG()
+    logger.info("libjpeg-turbo loaded for liveness frame decoding")
+except Exception as e:
+    logger.info(f"PyTurboJPEG not available: {e}. Using OpenCV to decode frames.")
+
 
 # MediaPipe landmark indices for eyes
 # Left eye: 33, 160, 158, 133, 153, 144
 # Right eye: 362, 385, 387, 263, 373, 380
-LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
+LEFT_EYE_INDICES = np.array([33, 160, 158, 133, 153, 144], dtype=np.int32)
+RIGHT_EYE_INDICES = np.array([362, 385, 387, 263, 373, 380], dtype=np.int32)
+EYE_INDICES = np.concatenate([LEFT_EYE_INDICES, RIGHT_EYE_INDICES])
+# Forehead, chin and both cheeks: enough to bound the face for ROI tracking
+FACE_OUTLINE_INDICES = np.array([10, 152, 234, 454], dtype=np.int32)
+_TRACKED_INDICES = np.concatenate([EYE_INDICES, FACE_OUTLINE_INDICES])
+_TRACKED_INDEX_LIST = tuple(_TRACKED_INDICES.tolist())  # Plain ints for protobuf indexing
+
+# Padding added around the last face box when cropping the next frame
+FACE_ROI_PADDING = 0.25
+
+# Point pairs for the EAR distances: (p2, p6), (p3, p5), (p1, p4)
+_EAR_FROM = np.array([1, 2, 0], dtype=np.int32)
+_EAR_TO = np.array([5, 4, 3], dtype=np.int32)
+
+# FaceMesh crops and resizes the face to 192x192 internally, so frames larger
+# than this only cost bytes. Kept well above that so eyes stay sharp in the crop.
+LANDMARK_MAX_SIDE = 640
 
 
 @dataclass
@@ -70,9 +125,12 @@ class LivenessResult:
         }
 
 
-def calculate_ear(eye_landmarks: List[Tuple[float, float]]) -> float:
+def calculate_ear(eye_landmarks) -> Union[float, np.ndarray]:
     """
     Calculate Eye Aspect Ratio (EAR).
+
+    Accepts one eye as six (x, y) points, or an (N, 6, 2) array of eyes,
+    in which case an (N,) array of EARs is returned.
     
     EAR = (||p2 - p6|| + ||p3 - p5||) / (2 * ||p1 - p4||)
     
@@ -83,56 +141,146 @@ def calculate_ear(eye_landmarks: List[Tuple[float, float]]) -> float:
     When eye is open: EAR ~ 0.25-0.3
     When eye is closed: EAR < 0.2
     """
-    if len(eye_landmarks) < 6:
-        return 0.3  # Default open eye value
-    
-    # Vertical distances
-    v1 = np.linalg.norm(np.array(eye_landmarks[1]) - np.array(eye_landmarks[5]))
-    v2 = np.linalg.norm(np.array(eye_landmarks[2]) - np.array(eye_landmarks[4]))
+    pts = np.asarray(eye_landmarks, dtype=np.float32)
+    single = pts.ndim == 2
+    if single:
+        if len(pts) < 6:
+            return 0.3  # Default open eye value
+        pts = pts[np.newaxis]
+
+    # Vertical distances v1, v2 and horizontal distance h in one pass
+    d = pts[:, _EAR_FROM] - pts[:, _EAR_TO]
+    v1, v2, h = np.sqrt((d * d).sum(axis=-1)).T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ear = np.where(h == 0, 0.3, (v1 + v2) / (2.0 * h))
+
+    return float(ear[0]) if single else ear
+
+
+def decode_rgb(frame_bytes: bytes, dst: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """
+    Decode JPEG/PNG bytes to an RGB array, or None if the data is unreadable.
+
+    If `dst` has the decoded frame's shape it is written in place instead of
+    allocating a new array, so a clip of same-sized frames reuses one buffer.
+    """
+    if _TJ is not None:
+        try:
+            if dst is not None:
+                width, height = _TJ.decode_header(frame_bytes)[:2]
+                if dst.shape == (height, width, 3):
+                    return _TJ.decode(frame_bytes, pixel_format=TJPF_RGB, dst=dst)
+            return _TJ.decode(frame_bytes, pixel_format=TJPF_RGB)
+        except Exception:
+            pass  # Not a JPEG (or corrupt) - let OpenCV try
+
+    nparr = np.frombuffer(frame_bytes, np.uint8)
+    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    if dst is not None and dst.shape == frame.shape:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def get_face_landmarks(
+    frame: np.ndarray,
+    roi: Optional[Tuple[int, int, int, int]] = None,
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Run FaceMesh on an RGB frame, optionally only inside roi = (x0, y0, x1, y1).
+
+    Returns (left_eye, right_eye, face_box) in full-frame pixels, where the
+    eyes are (6, 2) arrays and face_box is [x0, y0, x1, y1]; None if no face.
+    """
+    face_mesh = get_face_mesh()
+    if face_mesh is None:
+        return None
     
-    # Horizontal distance
-    h = np.linalg.norm(np.array(eye_landmarks[0]) - np.array(eye_landmarks[3]))
+    x0 = y0 = 0
+    if roi is not None:
+        x0, y0, x1, y1 = roi
+        frame = frame[y0:y1, x0:x1]
+
+    h, w = frame.shape[:2]
+    scale = LANDMARK_MAX_SIDE / max(h, w)
+    if scale < 1.0:
+        # Aspect-preserving shrink; landmarks are normalized, so (w, h) still applies
+        frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+
+    results = face_mesh.process(frame)
     
-    if h == 0:
-        return 0.3
+    if not results.multi_face_landmarks:
+        return None
     
-    ear = (v1 + v2) / (2.0 * h)
-    return ear
+    landmarks = results.multi_face_landmarks[0].landmark
+
+    # Read only the tracked points, then map normalized coords to frame pixels
+    pts = np.fromiter(
+        (c for idx in _TRACKED_INDEX_LIST for c in (landmarks[idx].x, landmarks[idx].y)),
+        dtype=np.float32,
+        count=2 * len(_TRACKED_INDEX_LIST),
+    ).reshape(-1, 2)
+    pts *= np.array([w, h], dtype=np.float32)
+    pts += np.array([x0, y0], dtype=np.float32)
+
+    eyes = pts[:12].reshape(2, 6, 2)
+    face_box = np.concatenate([pts.min(axis=0), pts.max(axis=0)])
+    return eyes[0], eyes[1], face_box
 
 
 def get_eye_landmarks(
     frame: np.ndarray
-) -> Tuple[Optional[List[Tuple]], Optional[List[Tuple]]]:
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
     """
-    Extract eye landmarks from frame using MediaPipe.
-    Returns (left_eye, right_eye) landmark lists or (None, None) if not available.
+    Extract eye landmarks from an RGB frame using MediaPipe.
+    Returns (left_eye, right_eye) as (6, 2) pixel arrays or (None, None) if not available.
     """
-    if not LANDMARKS_AVAILABLE or FACE_MESH is None:
-        return None, None
-    
-    # Convert BGR to RGB
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = FACE_MESH.process(rgb_frame)
-    
-    if not results.multi_face_landmarks:
+    found = get_face_landmarks(frame)
+    if found is None:
         return None, None
-    
-    face_landmarks = results.multi_face_landmarks[0]
+    return found[0], found[1]
+
+
+def padded_roi(face_box: np.ndarray, frame_shape: Tuple[int, ...]) -> Optional[Tuple[int, int, int, int]]:
+    """Face box grown by FACE_ROI_PADDING on every side, clipped to the frame."""
+    x0, y0, x1, y1 = face_box
+    pad_x = FACE_ROI_PADDING * (x1 - x0)
+    pad_y = FACE_ROI_PADDING * (y1 - y0)
+    h, w = frame_shape[:2]
+    roi = (
+        int(max(0, x0 - pad_x)), int(max(0, y0 - pad_y)),
+        int(min(w, x1 + pad_x)), int(min(h, y1 + pad_y)),
+    )
+    if roi[2] <= roi[0] or roi[3] <= roi[1]:
+        return None
+    return roi
+
+
+def eye_region_thumbnail(
+    frame: np.ndarray,
+    left_eye: np.ndarray,
+    right_eye: np.ndarray,
+    size: Tuple[int, int] = (32, 16),
+) -> Optional[np.ndarray]:
+    """
+    Small grayscale crop around both eyes, used to spot near-duplicate frames.
+
+    A blink barely moves a whole-frame thumbnail but dominates this crop, so
+    comparing crops never hides the EAR dip the blink detector relies on.
+    """
+    pts = np.concatenate([left_eye, right_eye])
+    (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+    pad = 0.25 * (x1 - x0)  # Eye corners span the crop; leave room for the lids
     h, w = frame.shape[:2]
-    
-    # Extract left eye landmarks
-    left_eye = []
-    for idx in LEFT_EYE_INDICES:
-        lm = face_landmarks.landmark[idx]
-        left_eye.append((lm.x * w, lm.y * h))
-    
-    # Extract right eye landmarks
-    right_eye = []
-    for idx in RIGHT_EYE_INDICES:
-        lm = face_landmarks.landmark[idx]
-        right_eye.append((lm.x * w, lm.y * h))
-    
-    return left_eye, right_eye
+    x0, x1 = int(max(0, x0 - pad)), int(min(w, x1 + pad))
+    y0, y1 = int(max(0, y0 - pad)), int(min(h, y1 + pad))
+    if x1 <= x0 or y1 <= y0:
+        return None
+
+    gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_RGB2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.int16)
 
 
 class LivenessService:
@@ -151,14 +299,28 @@ class LivenessService:
     - Dark glasses/sunglasses will fail
     """
     
+    # Frames decoded ahead of FaceMesh by the producer thread
+    PREFETCH_FRAMES = 2
+
     def __init__(self):
         self.ear_threshold = thresholds.EAR_BLINK_THRESHOLD
         self.min_blink_frames = thresholds.MIN_BLINK_FRAMES
+        self.reuse_max_diff = thresholds.LANDMARK_REUSE_MAX_DIFF
+        self.reuse_max_frames = thresholds.LANDMARK_REUSE_MAX_FRAMES
+        # Per-thread decode buffer; requests run concurrently in the threadpool
+        self._buffers = threading.local()
     
-    def _analyze_frame(self, frame_bytes: bytes) -> Optional[float]:
-        """Return average EAR for a frame or None if unavailable."""
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    def _decode(self, frame_bytes: bytes) -> Optional[np.ndarray]:
+        """Decode a frame into this thread's reusable RGB buffer."""
+        frame = decode_rgb(frame_bytes, getattr(self._buffers, "frame", None))
+        if frame is not None:
+            # Landmarks are copied out of the frame, so the next decode can overwrite it
+            self._buffers.frame = frame
+        return frame
+
+    def _extract_eyes(self, frame_bytes: bytes) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return (left_eye, right_eye) landmarks for a frame or None if unavailable."""
+        frame = self._decode(frame_bytes)
 
         if frame is None:
             return None
@@ -168,24 +330,132 @@ class LivenessService:
         if left_eye is None or right_eye is None:
             return None
 
-        left_ear = calculate_ear(left_eye)
-        right_ear = calculate_ear(right_eye)
-        return (left_ear + right_ear) / 2.0
-
-    def _update_blink_state(self, avg_ear: float, in_blink: bool, consecutive_closed: int) -> tuple[bool, int, int]:
-        """Update blink state based on EAR value."""
-        blink_count = 0
-        if avg_ear < self.ear_threshold:
-            consecutive_closed += 1
-            if consecutive_closed >= self.min_blink_frames and not in_blink:
-                in_blink = True
-        else:
-            if in_blink:
-                blink_count = 1
-                in_blink = False
-            consecutive_closed = 0
+        return left_eye, right_eye
+
+    def _decoded_frames(self, frames: List[bytes]) -> Iterator[Optional[np.ndarray]]:
+        """
+        Yield decoded RGB frames in order while a producer thread decodes ahead.
+
+        JPEG decoding and FaceMesh both release the GIL, so decoding frame
+        n+1 overlaps with landmark detection on frame n. The producer stays
+        at most PREFETCH_FRAMES ahead and cycles a small ring of buffers
+        that is big enough that it never overwrites a frame still in use.
+        """
+        ready: queue.Queue = queue.Queue(maxsize=self.PREFETCH_FRAMES)
+        stop = threading.Event()
+        done = object()
+
+        def produce():
+            # Live frames: up to PREFETCH_FRAMES queued, one consumed, one decoding
+            ring: List[Optional[np.ndarray]] = [None] * (self.PREFETCH_FRAMES + 2)
+            try:
+                for n, frame_bytes in enumerate(frames):
+                    slot = n % len(ring)
+                    frame = decode_rgb(frame_bytes, ring[slot])
+                    if frame is not None:
+                        ring[slot] = frame
+                    while not stop.is_set():
+                        try:
+                            ready.put(frame, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+            finally:
+                ready.put(done)
+
+        producer = threading.Thread(target=produce, name="liveness-decode", daemon=True)
+        producer.start()
+        try:
+            while True:
+                frame = ready.get()
+                if frame is done:
+                    return
+                yield frame
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue so it can exit
+            while producer.is_alive():
+                try:
+                    ready.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    def _track_eyes(self, frames: List[bytes]) -> Iterator[Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Eye landmarks for every frame, skipping FaceMesh on near-duplicates.
+
+        If the eye region of a frame differs from the last frame FaceMesh ran
+        on by less than `reuse_max_diff`, that frame's landmarks are reused.
+        FaceMesh still runs at least every `reuse_max_frames + 1` frames.
+
+        FaceMesh only sees a padded crop around the last detected face; if the
+        face isn't found in the crop the full frame is tried before giving up.
+
+        Landmarks are yielded frame by frame, so a caller that stops early
+        also stops decoding and inference for the remaining frames.
+        """
+        last_eyes = None
+        last_thumb = None
+        reused = 0
+        roi = None
+
+        for frame in self._decoded_frames(frames):
+            if frame is None:
+                yield None
+                continue
+
+            if last_eyes is not None and reused < self.reuse_max_frames:
+                thumb = eye_region_thumbnail(frame, *last_eyes)
+                if thumb is not None and np.abs(thumb - last_thumb).mean() < self.reuse_max_diff:
+                    reused += 1
+                    yield last_eyes
+                    continue
+
+            found = get_face_landmarks(frame, roi) if roi is not None else None
+            if found is None:
+                found = get_face_landmarks(frame)
+            if found is None:
+                last_eyes = last_thumb = roi = None
+                yield None
+                continue
+
+            left_eye, right_eye, face_box = found
+            roi = padded_roi(face_box, frame.shape)
+            last_thumb = eye_region_thumbnail(frame, left_eye, right_eye)
+            last_eyes = (left_eye, right_eye) if last_thumb is not None else None
+            reused = 0
+            yield left_eye, right_eye
+
+    def _frame_ears(self, frames: List[bytes]) -> Iterator[float]:
+        """Average EAR per frame, or -1 where no face was found."""
+        for pair in self._track_eyes(frames):
+            if pair is None:
+                yield -1
+            else:
+                # Both eyes in one vectorized call
+                yield float(calculate_ear(np.stack(pair)).mean())
+
+    def count_blinks(self, ear_values: List[float]) -> int:
+        """
+        Count completed blinks in an EAR sequence.
+
+        A blink is a run of at least `min_blink_frames` frames below the EAR
+        threshold that is followed by an open-eye frame. Frames without a
+        face (EAR of -1) are dropped first, so they neither break nor end a run.
+        """
+        ear = np.asarray(ear_values, dtype=np.float32)
+        ear = ear[ear >= 0]
+        closed = (ear < self.ear_threshold).astype(np.int8)
 
-        return in_blink, consecutive_closed, blink_count
+        d = np.diff(closed, prepend=0)
+        starts = np.flatnonzero(d == 1)
+        ends = np.flatnonzero(d == -1)  # First open frame after each run
+
+        # A run still closed at the last frame has no end and never counts
+        run_lengths = ends - starts[:len(ends)]
+        return int(np.count_nonzero(run_lengths >= self.min_blink_frames))
 
     def check_liveness(self, frames: List[bytes]) -> LivenessResult:
         """
@@ -219,24 +489,21 @@ class LivenessService:
             )
         
         ear_values: List[float] = []
-        blink_count = 0
-        in_blink = False
-        consecutive_closed = 0
-
-        for frame_bytes in frames:
-            avg_ear = self._analyze_frame(frame_bytes)
-
-            if avg_ear is None:
-                ear_values.append(-1)
-                continue
+        tracker = self._frame_ears(frames)
+        try:
+            for avg_ear in tracker:
+                ear_values.append(avg_ear)
+                # A blink can only complete on an open-eye frame
+                if (
+                    thresholds.LIVENESS_EARLY_EXIT
+                    and avg_ear >= self.ear_threshold
+                    and self.count_blinks(ear_values) >= 1
+                ):
+                    break
+        finally:
+            tracker.close()  # Stops the decode thread if we exited early
 
-            ear_values.append(avg_ear)
-            in_blink, consecutive_closed, just_blinked = self._update_blink_state(
-                avg_ear,
-                in_blink,
-                consecutive_closed,
-            )
-            blink_count += just_blinked
+        blink_count = self.count_blinks(ear_values)
         
         # Determine result
         passed = blink_count >= 1
@@ -253,7 +520,7 @@ class LivenessService:
             blink_detected=blink_count > 0,
             blink_count=blink_count,
             ear_values=ear_values,
-            frames_analyzed=len(frames),
+            frames_analyzed=len(ear_values),
             message=message
         )
     
@@ -269,17 +536,11 @@ class LivenessService:
         if not LANDMARKS_AVAILABLE:
             return True  # Assume live if can't check
         
-        nparr = np.frombuffer(frame_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if frame is None:
-            return False
-        
-        left_eye, right_eye = get_eye_landmarks(frame)
-        
-        if left_eye is None or right_eye is None:
+        eyes = self._extract_eyes(frame_bytes)
+        if eyes is None:
             return False
         
+        left_eye, right_eye = eyes
         left_ear = calculate_ear(left_eye)
         right_ear = calculate_ear(right_eye)
         avg_ear = (left_ear + right_ear) / 2.0
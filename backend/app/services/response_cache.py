@@ -0,0 +1,90 @@
+"""
+Response Cache
+Process-wide cache of serialized GET responses for read-heavy listings.
+
+GET /students and GET /logs re-queried SQLite and re-serialized every row on
+each poll, although the rows only change when students register or
+attendance is marked. Bodies are cached per key (e.g. session filter and
+limit) and dropped when a committed transaction touched Student or
+AttendanceLog rows. Writes made by another Uvicorn worker fire no events
+here, so every entry also expires after a short TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as DBSession, object_session
+
+from app.core.config import config
+from app.models.attendance import Student, AttendanceLog
+
+
+class ResponseCache:
+    """Thread-safe LRU of response bodies with a TTL."""
+
+    def __init__(self, ttl: float, maxsize: int = 64):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, bytes]]" = OrderedDict()
+        self._generation = 0
+
+    def invalidate(self, *_args) -> None:
+        """Drop every cached body."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        """Return the cached body for key, building and storing it on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            generation = self._generation
+
+        body = build()
+        with self._lock:
+            # A write committed while we were building; don't pin stale rows
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, body)
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return body
+
+
+students_cache = ResponseCache(ttl=config.READ_CACHE_TTL)
+logs_cache = ResponseCache(ttl=config.READ_CACHE_TTL)
+
+# Caches whose bodies depend on each model (logs carry student names too)
+_DEPENDENT_CACHES = {
+    Student: (students_cache, logs_cache),
+    AttendanceLog: (logs_cache,),
+}
+
+# Mapper events fire at flush, before the rows are visible to other sessions;
+# they only note the caches on the session, which are cleared once it commits.
+_DIRTY_KEY = "response_cache_dirty"
+
+
+def _mark_dirty(mapper, _connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).update(_DEPENDENT_CACHES[mapper.class_])
+
+
+def _invalidate_on_commit(session) -> None:
+    for cache in session.info.pop(_DIRTY_KEY, ()):
+        cache.invalidate()
+
+
+for _model in _DEPENDENT_CACHES:
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _mark_dirty)
+event.listen(DBSession, "after_commit", _invalidate_on_commit)
@@ -11,48 +11,98 @@ Usage:
 import sys
 import json
 import os
+import threading
 from pathlib import Path
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
-import pytesseract
-from PIL import Image
+import cv2
 from groq import Groq
 
+# tesserocr keeps one Tesseract engine loaded across calls; pytesseract
+# spawns a tesseract process per image and is the fallback.
+try:
+    from PIL import Image
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    import pytesseract
+    TESSEROCR_AVAILABLE = False
+
+_TESS = None
+# A Tesseract engine holds one image at a time; SetImage/GetUTF8Text pairs
+# from concurrent callers must not interleave
+_TESS_LOCK = threading.Lock()
+
+# Phone photos of printed timetables rarely need more than this for OCR
+OCR_MAX_SIDE = 4000
+
+
+def preprocess_for_ocr(image_path: str):
+    """Load the image as grayscale and binarize it for Tesseract."""
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError(f"Could not read image: {image_path}")
+    
+    longest = max(img.shape[:2])
+    if longest > OCR_MAX_SIDE:
+        scale = OCR_MAX_SIDE / longest
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    # Adaptive threshold copes with uneven lighting and shadows on photos
+    return cv2.adaptiveThreshold(
+        img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+    )
+
+
+def get_tesseract_api():
+    """Return the shared in-process Tesseract engine, created on first use.
+
+    Callers must hold _TESS_LOCK while using it.
+    """
+    global _TESS
+    if _TESS is None:
+        # Same settings as the CLI path (--oem 3 --psm 6): default engine, single uniform block
+        _TESS = PyTessBaseAPI(lang="eng", psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT)
+    return _TESS
+
+
 def extract_text_with_ocr(image_path: str) -> str:
     """Extract text from image using Tesseract OCR."""
     print(f"\n📷 Loading image: {image_path}")
-    img = Image.open(image_path)
+    img = preprocess_for_ocr(image_path)
     
     print("🔍 Running OCR (Tesseract)...")
+    if TESSEROCR_AVAILABLE:
+        with _TESS_LOCK:
+            api = get_tesseract_api()
+            api.SetImage(Image.fromarray(img))
+            return api.GetUTF8Text()
+    
     # Use detailed config for better table extraction
     custom_config = r'--oem 3 --psm 6'
-    text = pytesseract.image_to_string(img, config=custom_config)
+    text = pytesseract.image_to_string(img, config=custom_config, lang="eng")
     
     return text
 
 
-def structure_with_groq(raw_text: str) -> dict:
-    """Use Groq LLM to structure OCR text into JSON."""
-    
-    # Check API key
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        print("ERROR: GROQ_API_KEY not found in .env file!")
-        sys.exit(1)
-    
-    # Initialize Groq client
-    client = Groq(api_key=api_key)
-    
-    # Create prompt for structuring
-    prompt = f"""You are a timetable parsing expert. I have extracted the following raw text from a college timetable image using OCR. 
+GROQ_MODEL = "llama-3.3-70b-versatile"
+# Output is billed and generated up to this cap; raise it for very large timetables
+GROQ_MAX_TOKENS = int(os.getenv("GROQ_MAX_TOKENS", "2048"))
+
+SYSTEM_PROMPT = "You are an expert at parsing and structuring timetable data. Always return valid JSON."
+
+# Built once at import; only the OCR text changes per call
+PROMPT_HEAD = """You are a timetable parsing expert. I have extracted the following raw text from a college timetable image using OCR. 
 Please analyze it and convert it into a structured JSON format.
 
 RAW OCR TEXT:
 ---
-{raw_text}
+"""
+
+PROMPT_TAIL = """
 ---
 
 IMPORTANT RULES:
@@ -62,11 +112,11 @@ IMPORTANT RULES:
 4. Return ONLY valid JSON, no explanations
 
 Required JSON structure:
-{{
+{
   "college_name": "extracted or N/A",
   "total_slots": number,
   "schedule": [
-    {{
+    {
       "day": "Monday",
       "time": "09:00 - 10:00",
       "period": 1,
@@ -75,36 +125,38 @@ Required JSON structure:
       "teacher": "Prof. Name",
       "room": "101",
       "class_group": "CSE-A"
-    }}
+    }
   ]
-}}"""
+}"""
+
+
+def structure_with_groq(raw_text: str) -> dict:
+    """Use Groq LLM to structure OCR text into JSON."""
+    
+    # Check API key
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        print("ERROR: GROQ_API_KEY not found in .env file!")
+        sys.exit(1)
+    
+    # Initialize Groq client
+    client = Groq(api_key=api_key)
     
     print("🤖 Structuring with Groq Llama 3...")
     
-    # Send to Groq
+    # Send to Groq; JSON mode guarantees a bare JSON object (no markdown fences)
     response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+        model=GROQ_MODEL,
         messages=[
-            {"role": "system", "content": "You are an expert at parsing and structuring timetable data. Always return valid JSON."},
-            {"role": "user", "content": prompt}
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": PROMPT_HEAD + raw_text + PROMPT_TAIL}
         ],
-        max_tokens=4096,
+        response_format={"type": "json_object"},
+        max_tokens=GROQ_MAX_TOKENS,
         temperature=0.1  # Low temperature for more consistent output
     )
     
-    # Parse response
-    raw_text = response.choices[0].message.content.strip()
-    
-    # Clean JSON from markdown
-    if raw_text.startswith("```json"):
-        raw_text = raw_text[7:]
-    if raw_text.startswith("```"):
-        raw_text = raw_text[3:]
-    if raw_text.endswith("```"):
-        raw_text = raw_text[:-3]
-    raw_text = raw_text.strip()
-    
-    return json.loads(raw_text)
+    return json.loads(response.choices[0].message.content)
 
 
 def print_table(data: dict):
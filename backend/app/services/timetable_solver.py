@@ -3,18 +3,29 @@ Google OR-Tools Constraint Programming Solver for Timetable Generation
 Enterprise-grade solver with hard constraints and optimization objectives
 """
 
+import os
 from ortools.sat.python import cp_model
 from typing import List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from app.models.timetable import Teacher, Room, Subject, ClassGroup, TimetableEntry
 from app.core.config import config
 
+# Slot key: (class_group_id, day, period)
+SlotKey = Tuple[int, int, int]
+# Per-slot decision variables: (subject, teacher, room) ids
+SlotVars = Tuple[cp_model.IntVar, cp_model.IntVar, cp_model.IntVar]
+
+
 class TimetableSolver:
     def __init__(self, db_session: Session):
         self.db = db_session
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
         self.solver.parameters.max_time_in_seconds = config.SOLVER_TIME_LIMIT
+        # Parallel portfolio/LNS search; scales with cores on large timetables
+        self.solver.parameters.num_workers = config.SOLVER_NUM_WORKERS or os.cpu_count() or 8
+        self.solver.parameters.log_search_progress = False
+        self.solver.parameters.cp_model_presolve = True
         
         # Data structures
         self.days = range(config.DAYS_PER_WEEK)
@@ -35,129 +46,114 @@ class TimetableSolver:
             "class_groups": {cg.id: cg for cg in class_groups}
         }
     
-    def create_variables(self, resources: Dict[str, Any]) -> Dict:
-        """Create decision variables for the CP-SAT model"""
+    def valid_assignments(self, resources: Dict[str, Any]) -> List[Tuple[int, int, int]]:
+        """
+        Every feasible (subject, teacher, room) triple: the teacher is
+        assigned to the subject and lab subjects get a lab room.
+        """
+        triples = []
+        for subj_id, subject in resources["subjects"].items():
+            qualified_teacher_ids = [t.id for t in subject.teachers if t.id in resources["teachers"]]
+            allowed_room_ids = [
+                room_id for room_id, room in resources["rooms"].items()
+                if room.is_lab or not subject.requires_lab
+            ]
+            for teacher_id in qualified_teacher_ids:
+                for room_id in allowed_room_ids:
+                    triples.append((subj_id, teacher_id, room_id))
+        return triples
+    
+    def create_variables(self, resources: Dict[str, Any]) -> Dict[SlotKey, SlotVars]:
+        """
+        Create decision variables for the CP-SAT model.
+
+        Each (class group, day, period) slot gets three integer variables
+        holding the subject, teacher and room ids taught there, so the model
+        grows with the number of slots rather than with every possible
+        subject/teacher/room combination.
+        """
         variables = {}
+        triples = self.valid_assignments(resources)
+        subject_domain = cp_model.Domain.FromValues(sorted({s for s, _, _ in triples}))
+        teacher_domain = cp_model.Domain.FromValues(sorted({t for _, t, _ in triples}))
+        room_domain = cp_model.Domain.FromValues(sorted({r for _, _, r in triples}))
         
         for cg_id in resources["class_groups"]:
             for day in self.days:
                 for period in self.periods:
-                    for subj_id in resources["subjects"]:
-                        for teacher_id in resources["teachers"]:
-                            for room_id in resources["rooms"]:
-                                var_name = f"cg{cg_id}_d{day}_p{period}_s{subj_id}_t{teacher_id}_r{room_id}"
-                                variables[var_name] = self.model.NewBoolVar(var_name)
+                    slot = f"cg{cg_id}_d{day}_p{period}"
+                    variables[(cg_id, day, period)] = (
+                        self.model.NewIntVarFromDomain(subject_domain, f"{slot}_subject"),
+                        self.model.NewIntVarFromDomain(teacher_domain, f"{slot}_teacher"),
+                        self.model.NewIntVarFromDomain(room_domain, f"{slot}_room"),
+                    )
         
         return variables
     
-    def add_hard_constraints(self, resources: Dict[str, Any], variables: Dict):
+    def add_hard_constraints(self, resources: Dict[str, Any], variables: Dict[SlotKey, SlotVars]):
         """Add hard constraints that MUST be satisfied"""
         
-        # Constraint 1: Each class group has exactly one class per period
-        for cg_id in resources["class_groups"]:
-            for day in self.days:
-                for period in self.periods:
-                    slot_vars = []
-                    for subj_id in resources["subjects"]:
-                        for teacher_id in resources["teachers"]:
-                            for room_id in resources["rooms"]:
-                                var_name = f"cg{cg_id}_d{day}_p{period}_s{subj_id}_t{teacher_id}_r{room_id}"
-                                if var_name in variables:
-                                    slot_vars.append(variables[var_name])
-                    if slot_vars:
-                        self.model.Add(sum(slot_vars) == 1)
+        # Constraint 1: Each class group has exactly one class per period, and
+        # it must be a feasible assignment (qualified teacher, lab room for labs)
+        triples = self.valid_assignments(resources)
+        if not triples:
+            self.model.AddBoolOr([])  # Nothing can be scheduled anywhere
+            return
+        for slot_vars in variables.values():
+            self.model.AddAllowedAssignments(list(slot_vars), triples)
         
         # Constraint 2: Teacher cannot teach multiple classes at the same time
-        for teacher_id in resources["teachers"]:
-            for day in self.days:
-                for period in self.periods:
-                    teacher_vars = [
-                        v for k, v in variables.items()
-                        if f"_t{teacher_id}_" in k and f"_d{day}_p{period}_" in k
-                    ]
-                    if teacher_vars:
-                        self.model.Add(sum(teacher_vars) <= 1)
-        
         # Constraint 3: Room cannot host multiple classes at the same time
-        for room_id in resources["rooms"]:
-            for day in self.days:
-                for period in self.periods:
-                    room_vars = [
-                        v for k, v in variables.items()
-                        if f"_r{room_id}" in k and f"_d{day}_p{period}_" in k
-                    ]
-                    if room_vars:
-                        self.model.Add(sum(room_vars) <= 1)
-        
-        # Constraint 4: Lab subjects must use lab rooms
-        for subj_id, subject in resources["subjects"].items():
-            if subject.requires_lab:
-                for cg_id in resources["class_groups"]:
-                    for day in self.days:
-                        for period in self.periods:
-                            for teacher_id in resources["teachers"]:
-                                for room_id, room in resources["rooms"].items():
-                                    if not room.is_lab:
-                                        var_name = f"cg{cg_id}_d{day}_p{period}_s{subj_id}_t{teacher_id}_r{room_id}"
-                                        if var_name in variables:
-                                            self.model.Add(variables[var_name] == 0)
-        
-        # Constraint 5: Subject-Teacher compatibility (only assigned teachers can teach subjects)
-        for subj_id, subject in resources["subjects"].items():
-            qualified_teacher_ids = {t.id for t in subject.teachers}
-            for cg_id in resources["class_groups"]:
-                for day in self.days:
-                    for period in self.periods:
-                        for teacher_id in resources["teachers"]:
-                            if teacher_id not in qualified_teacher_ids:
-                                for room_id in resources["rooms"]:
-                                    var_name = f"cg{cg_id}_d{day}_p{period}_s{subj_id}_t{teacher_id}_r{room_id}"
-                                    if var_name in variables:
-                                        self.model.Add(variables[var_name] == 0)
-        
-        # Constraint 6: Weekly session requirements
+        for day in self.days:
+            for period in self.periods:
+                slots = [variables[(cg_id, day, period)] for cg_id in resources["class_groups"]]
+                if len(slots) > 1:
+                    self.model.AddAllDifferent([teacher for _, teacher, _ in slots])
+                    self.model.AddAllDifferent([room for _, _, room in slots])
+        
+        # Constraint 4: Weekly session requirements
         for cg_id in resources["class_groups"]:
             for subj_id, subject in resources["subjects"].items():
-                weekly_vars = [
-                    v for k, v in variables.items()
-                    if f"cg{cg_id}_" in k and f"_s{subj_id}_" in k
-                ]
-                if weekly_vars:
-                    self.model.Add(sum(weekly_vars) == subject.weekly_sessions)
+                is_subject = []
+                for day in self.days:
+                    for period in self.periods:
+                        subject_var = variables[(cg_id, day, period)][0]
+                        taught = self.model.NewBoolVar(f"cg{cg_id}_d{day}_p{period}_is_s{subj_id}")
+                        self.model.Add(subject_var == subj_id).OnlyEnforceIf(taught)
+                        self.model.Add(subject_var != subj_id).OnlyEnforceIf(taught.Not())
+                        is_subject.append(taught)
+                self.model.Add(sum(is_subject) == subject.weekly_sessions)
     
-    def add_soft_constraints(self, resources: Dict[str, Any], variables: Dict):
-        """Add optimization objectives"""
-        
-        # Objective: Minimize gaps in student schedules
-        gap_penalties = []
-        
-        for cg_id in resources["class_groups"]:
-            for day in self.days:
-                for period in range(len(self.periods) - 1):
-                    # Check if there's a class in current period but not in next
-                    current_period_vars = [
-                        v for k, v in variables.items()
-                        if f"cg{cg_id}_d{day}_p{period}_" in k
-                    ]
-                    next_period_vars = [
-                        v for k, v in variables.items()
-                        if f"cg{cg_id}_d{day}_p{period+1}_" in k
-                    ]
-                    
-                    # Add penalty for gaps
-                    if current_period_vars and next_period_vars:
-                        has_current = self.model.NewBoolVar(f"has_cg{cg_id}_d{day}_p{period}")
-                        has_next = self.model.NewBoolVar(f"has_cg{cg_id}_d{day}_p{period+1}")
-                        gap = self.model.NewBoolVar(f"gap_cg{cg_id}_d{day}_p{period}")
-                        
-                        self.model.Add(sum(current_period_vars) >= 1).OnlyEnforceIf(has_current)
-                        self.model.Add(sum(next_period_vars) >= 1).OnlyEnforceIf(has_next)
-                        
-                        gap_penalties.append(gap)
-        
-        # Minimize total gaps
-        if gap_penalties:
-            self.model.Minimize(sum(gap_penalties))
+    def add_soft_constraints(self, resources: Dict[str, Any], variables: Dict[SlotKey, SlotVars]):
+        """
+        Add optimization objectives.
+
+        Gap minimization has nothing to act on while constraint 1 fills every
+        period; there is no empty slot for a gap to appear in. This hook stays
+        for objectives that do depend on the assignment.
+        """
+    
+    def add_solution_hint(self, resources: Dict[str, Any], variables: Dict[SlotKey, SlotVars]) -> int:
+        """
+        Warm-start CP-SAT from the saved timetable.
+
+        Timetables change little week to week, so every slot whose stored
+        entry is still a feasible assignment is hinted with its previous
+        subject, teacher and room. Returns the number of hinted slots.
+        """
+        valid = set(self.valid_assignments(resources))
+        hinted = 0
+        
+        for entry in self.db.query(TimetableEntry).all():
+            slot_vars = variables.get((entry.class_group_id, entry.day, entry.period))
+            assignment = (entry.subject_id, entry.teacher_id, entry.room_id)
+            if slot_vars is None or assignment not in valid:
+                continue
+            for var, value in zip(slot_vars, assignment):
+                self.model.AddHint(var, value)
+            hinted += 1
+        
+        return hinted
     
     def solve(self) -> Tuple[bool, Dict[str, Any]]:
         """Run the solver and return results"""
@@ -169,6 +165,7 @@ class TimetableSolver:
         variables = self.create_variables(resources)
         self.add_hard_constraints(resources, variables)
         self.add_soft_constraints(resources, variables)
+        self.add_solution_hint(resources, variables)
         
         status = self.solver.Solve(self.model)
         
@@ -189,34 +186,27 @@ class TimetableSolver:
                 "status": "infeasible"
             }
     
-    def extract_solution(self, variables: Dict, resources: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def extract_solution(self, variables: Dict[SlotKey, SlotVars], resources: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract the solution from the model"""
         schedule = []
         
-        for var_name, var in variables.items():
-            if self.solver.Value(var) == 1:
-                # Parse variable name: cg{cg_id}_d{day}_p{period}_s{subj_id}_t{teacher_id}_r{room_id}
-                parts = var_name.split('_')
-                cg_id = int(parts[0][2:])
-                day = int(parts[1][1:])
-                period = int(parts[2][1:])
-                subj_id = int(parts[3][1:])
-                teacher_id = int(parts[4][1:])
-                room_id = int(parts[5][1:])
-                
-                schedule.append({
-                    "class_group_id": cg_id,
-                    "class_group_name": resources["class_groups"][cg_id].name,
-                    "day": day,
-                    "period": period,
-                    "subject_id": subj_id,
-                    "subject_name": resources["subjects"][subj_id].name,
-                    "subject_code": resources["subjects"][subj_id].code,
-                    "teacher_id": teacher_id,
-                    "teacher_name": resources["teachers"][teacher_id].name,
-                    "room_id": room_id,
-                    "room_number": resources["rooms"][room_id].room_number,
-                })
+        for (cg_id, day, period), (subject_var, teacher_var, room_var) in variables.items():
+            subj_id = self.solver.Value(subject_var)
+            teacher_id = self.solver.Value(teacher_var)
+            room_id = self.solver.Value(room_var)
+            schedule.append({
+                "class_group_id": cg_id,
+                "class_group_name": resources["class_groups"][cg_id].name,
+                "day": day,
+                "period": period,
+                "subject_id": subj_id,
+                "subject_name": resources["subjects"][subj_id].name,
+                "subject_code": resources["subjects"][subj_id].code,
+                "teacher_id": teacher_id,
+                "teacher_name": resources["teachers"][teacher_id].name,
+                "room_id": room_id,
+                "room_number": resources["rooms"][room_id].room_number,
+            })
         
         return sorted(schedule, key=lambda x: (x["class_group_id"], x["day"], x["period"]))
     
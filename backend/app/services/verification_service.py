@@ -105,24 +105,33 @@ class VerificationService:
                 frame_count=0
             )
         
-        # Process each frame
-        frame_results = []
+        # Frames are verified in parallel and consumed in frame order
+        frame_results = face_service.iter_verify_students(frames)
+        
         identities = []
+        identity_set = set()
         confidences = []
         multi_face_count = 0
         no_face_count = 0
+        frames_checked = 0
         
-        for i, frame_bytes in enumerate(frames):
-            result = self.verify_single_frame(frame_bytes)
-            frame_results.append(result)
-            
+        for frames_checked, result in enumerate(frame_results, 1):
             if result.get("status") == "multiple_faces":
                 multi_face_count += 1
+                if self.thresholds.MULTI_FACE_IS_PROXY_RISK:
+                    # Decided whatever the remaining frames hold; stop here
+                    frame_results.close()
+                    break
             elif result.get("status") == "no_face":
                 no_face_count += 1
             elif result.get("status") == "success" and result.get("match"):
                 identities.append(result.get("student_name"))
+                identity_set.add(result.get("student_name"))
                 confidences.append(result.get("confidence", 0))
+                if len(identity_set) > 1 and len(identities) >= self.thresholds.REQUIRED_CONSISTENT_FRAMES:
+                    # Identity switch is proven; later frames can't make this pass
+                    frame_results.close()
+                    break
         
         # Analyze results
         frame_count = len(frames)
@@ -134,7 +143,7 @@ class VerificationService:
                 success=False,
                 status="Proxy Suspected: Multiple Faces",
                 is_proxy_suspected=True,
-                proxy_reason=f"Multiple faces detected in {multi_face_count}/{frame_count} frames",
+                proxy_reason=f"Multiple faces detected in frame {frames_checked}/{frame_count}",
                 frame_count=frame_count,
                 frames_matched=frames_matched
             )
@@ -168,7 +177,7 @@ class VerificationService:
                 )
         
         # Check if all matched frames have same identity
-        unique_identities = set(identities)
+        unique_identities = identity_set
         if len(unique_identities) > 1:
             # Identity switched mid-verification
             return VerificationResult(
@@ -259,14 +268,18 @@ class VerificationService:
         Check if student already has attendance in this session.
         Returns the existing log if found, None otherwise.
         """
-        # Find student
-        student = db.query(Student).filter(Student.name == student_name).first()
-        if not student:
-            return None
+        # Student lookup runs as a subquery of the log lookup: one round trip,
+        # both sides indexed (students.name, the student/session/status index)
+        student_id = (
+            db.query(Student.id)
+            .filter(Student.name == student_name)
+            .limit(1)
+            .scalar_subquery()
+        )
         
         # Check for existing attendance in session
         existing = db.query(AttendanceLog).filter(
-            AttendanceLog.student_id == student.id,
+            AttendanceLog.student_id == student_id,
             AttendanceLog.session_id == session_id,
             AttendanceLog.status.in_(["Verified", "Verified (Biometric)", "Face Verified"])
         ).first()
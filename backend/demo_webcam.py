@@ -1,11 +1,64 @@
 import cv2
 import requests
+import sys
 import time
 from datetime import datetime
 
 # Configuration
 API_URL = "http://localhost:8000/api/attendance/mark"
+MULTI_API_URL = "http://localhost:8000/api/attendance/mark-multi"
 REGISTER_URL = "http://localhost:8000/api/attendance/register"
+# Upload size: plenty for LBPH, a fraction of the bytes of a full-res q95 JPEG
+UPLOAD_MAX_SIZE = (640, 480)
+UPLOAD_JPEG_QUALITY = 80
+# Multi-frame burst: 5 frames over ~300 ms, sent in one request
+BURST_FRAMES = 5
+BURST_INTERVAL = 0.075  # seconds between frames
+
+def encode_for_upload(frame):
+    """Fit the frame inside UPLOAD_MAX_SIZE (keeping aspect) and JPEG-encode it."""
+    h, w = frame.shape[:2]
+    scale = min(UPLOAD_MAX_SIZE[0] / w, UPLOAD_MAX_SIZE[1] / h)
+    if scale < 1.0:
+        frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    _, img_encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, UPLOAD_JPEG_QUALITY])
+    return img_encoded.tobytes()
+
+def capture_burst(cap, count=BURST_FRAMES, interval=BURST_INTERVAL):
+    """Read `count` fresh frames `interval` seconds apart, encoded for upload."""
+    encoded = []
+    for i in range(count):
+        if i:
+            time.sleep(interval)
+        ret, frame = cap.read()
+        if ret:
+            encoded.append(encode_for_upload(frame))
+    return encoded
+
+def status_banner(st_text, name):
+    """Overlay text and colour for a verification status."""
+    if "Proxy Suspected" in st_text:
+        return f"ALERT: {st_text}", (0, 0, 255)  # Red
+    if "Verified" in st_text:
+        return f"SUCCESS: {name} Marked Present", (0, 200, 0)  # Green
+    return f"{st_text}", (0, 165, 255)  # Orange
+
+def open_camera(index=0):
+    """
+    Open the kiosk camera as MJPG 640x480@30 with a one-frame driver buffer,
+    so read() returns the newest frame instead of a queued, stale one.
+    """
+    backend = cv2.CAP_DSHOW if sys.platform == "win32" else cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(index)
+    # FOURCC before the size: some drivers only offer 640x480@30 compressed
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
 
 def register_student(name, roll_no, fingerprint_id, id_card_code, image_path):
     print(f"[INFO] Registering {name}...")
@@ -28,6 +81,7 @@ def run_attendance_kiosk():
     print("  SPACE - Mark Attendance (Face Recognition)")
     print("  F     - Mark + Fingerprint Simulation")
     print("  I     - Mark + ID Card Simulation")
+    print("  V     - Multi-Frame Verify (5-frame burst, one request)")
     print("  N     - Simulate No Face (Biometric Fallback)")
     print("  M     - Simulate Multiple Faces (Biometric Fallback)")
     print("  Q     - Quit")
@@ -39,7 +93,7 @@ def run_attendance_kiosk():
     print("  - No face detected: Require fingerprint")
     print("  - Multiple faces: Require fingerprint")
     
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0)
     
     # Simulation Data
     sim_fingerprint = "hash_ash_123"
@@ -78,8 +132,7 @@ def run_attendance_kiosk():
             status_timer = time.time()
             
             # Encode frame
-            _, img_encoded = cv2.imencode('.jpg', frame)
-            files = {"file": img_encoded.tobytes()}
+            files = {"file": encode_for_upload(frame)}
             
             data = {}
             if key == ord('f'):
@@ -103,16 +156,7 @@ def run_attendance_kiosk():
                     
                     print(f"✅ Result: {st_text} ({name})")
                     
-                    if "Proxy Suspected" in st_text:
-                        last_status = f"ALERT: {st_text}"
-                        last_status_color = (0, 0, 255) # Red
-                    elif "Verified" in st_text:
-                        last_status = f"SUCCESS: {name} Marked Present"
-                        last_status_color = (0, 200, 0) # Green
-                    else:
-                        last_status = f"{st_text}"
-                        last_status_color = (0, 165, 255) # Orange
-                        
+                    last_status, last_status_color = status_banner(st_text, name)
                     status_timer = time.time()
                 else:
                     print(f"❌ Error: {res.text}")
@@ -126,6 +170,31 @@ def run_attendance_kiosk():
                 last_status_color = (0, 0, 255)
                 status_timer = time.time()
                 
+        elif key == ord('v'):
+            print("\n[ACTION] Capturing burst & Verifying...")
+            frames = capture_burst(cap)
+            files = [("files", (f"f{i}.jpg", data, "image/jpeg")) for i, data in enumerate(frames)]
+            
+            try:
+                res = requests.post(MULTI_API_URL, files=files)
+                
+                if res.status_code == 200:
+                    result = res.json()
+                    name = result.get('student_name') or 'Unknown'
+                    st_text = result['status']
+                    print(f"✅ Result: {st_text} ({name}, {len(frames)} frames)")
+                    last_status, last_status_color = status_banner(st_text, name)
+                else:
+                    print(f"❌ Error: {res.text}")
+                    last_status = "Error: See Console"
+                    last_status_color = (0, 0, 255)
+                    
+            except Exception as e:
+                print(f"❌ Connection Failed: {e}")
+                last_status = "Connection Failed"
+                last_status_color = (0, 0, 255)
+            status_timer = time.time()
+                
     cap.release()
     cv2.destroyAllWindows()
 
@@ -2,6 +2,7 @@
 Initialize test users for authentication testing
 """
 
+from functools import lru_cache
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal, engine
 from app.models.user import User, UserRole, Base
@@ -9,6 +10,11 @@ from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@lru_cache(maxsize=None)
+def hash_password(password: str) -> str:
+    """bcrypt is deliberately slow; hash each distinct seed password once."""
+    return pwd_context.hash(password)
+
 def init_users():
     """Create test users for authentication"""
     # Create users table
@@ -52,7 +58,7 @@ def init_users():
 
         for data in users_data:
             user = db.query(User).filter(User.username == data["username"]).first()
-            hashed = pwd_context.hash(data["password"])
+            hashed = hash_password(data["password"])
             if user:
                 # Update existing user
                 user.password_hash = hashed
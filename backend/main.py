@@ -1,5 +1,7 @@
 """
-Entry point for the Attendify backend application.
+Development entry point for the Attendify backend (auto-reload, one worker).
+
+Production: `python -m app.main` starts UVICORN_WORKERS worker processes.
 """
 
 from app.main import app
@@ -0,0 +1,43 @@
+"""
+Shared test fixtures.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Before anything imports app.core.database: tests must never open (let alone
+# modify) the real attendance.db
+os.environ["DATABASE_URL"] = "sqlite://"
+
+
+@pytest.fixture
+def db_engine():
+    """Fresh in-memory SQLite database with every table created."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from app.core.database import Base
+    import app.models.attendance, app.models.session, app.models.timetable, app.models.user  # noqa: F401
+
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Session bound to the in-memory database."""
+    from sqlalchemy.orm import sessionmaker
+
+    session = sessionmaker(bind=db_engine, autoflush=False)()
+    yield session
+    session.close()
@@ -0,0 +1,99 @@
+"""
+Unit Tests for the Anomaly Detection Service
+Tests the brute-force failure count's index use and the in-request checks.
+"""
+
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from app.core.database import utc_now
+from app.models.attendance import AttendanceLog, Student
+from app.services.anomaly_service import (
+    CAMPUS_LAT, CAMPUS_LON, RiskLevel, _fetch_activity_counts, analyze_in_request
+)
+
+# ~11km north of campus
+FAR_LAT = CAMPUS_LAT + 0.1
+
+
+class TestFailedAttemptQueries:
+    """Test the query plans behind the failed-attempt checks"""
+
+    def test_student_failure_count_uses_partial_index(self, db_engine, db_session):
+        """The per-student failure count reads idx_attendance_failed_student_ts"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(db_engine, "before_cursor_execute", capture)
+        try:
+            _fetch_activity_counts(db_session, student_id=1, ip_address=None, now=utc_now())
+        finally:
+            event.remove(db_engine, "before_cursor_execute", capture)
+
+        statement, parameters = statements[-1]
+        with db_engine.connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_attendance_failed_student_ts" in details, details
+
+
+class TestAnalyzeInRequest:
+    """Test which checks run before the attendance response"""
+
+    def make_student(self, db):
+        student = Student(name="Jane Doe", roll_number="R1", photo_folder_path="x")
+        db.add(student)
+        db.commit()
+        return student
+
+    def test_clean_log_defers_db_checks(self, db_session):
+        """An on-campus log is left for the background analysis, unflushed"""
+        student = self.make_student(db_session)
+        log = AttendanceLog(student_id=student.id, status="Verified")
+
+        result, complete = analyze_in_request(db_session, log, CAMPUS_LAT, CAMPUS_LON)
+
+        assert not complete
+        assert not result.is_anomaly
+        assert log.id is None
+        assert log.risk_level is None
+
+    def test_flagged_log_gets_impossible_travel_inline(self, db_session):
+        """Off-campus plus impossible travel is CRITICAL before the response"""
+        student = self.make_student(db_session)
+        db_session.add(AttendanceLog(
+            student_id=student.id, status="Verified",
+            latitude=CAMPUS_LAT, longitude=CAMPUS_LON,
+            timestamp=utc_now() - timedelta(minutes=1)
+        ))
+        db_session.commit()
+        log = AttendanceLog(student_id=student.id, status="Verified", latitude=FAR_LAT, longitude=CAMPUS_LON)
+
+        result, complete = analyze_in_request(db_session, log, FAR_LAT, CAMPUS_LON)
+
+        assert complete
+        assert result.risk_level == RiskLevel.CRITICAL
+        assert any("Impossible Travel" in reason for reason in result.reasons)
+        assert log.is_anomaly
+        assert log.risk_level == RiskLevel.CRITICAL.value
+        assert "Impossible Travel" in log.anomaly_reason
+
+    def test_flagged_log_counts_recent_failures_but_not_itself(self, db_session):
+        """Repeated failures are scored inline; the flushed log isn't one of them"""
+        student = self.make_student(db_session)
+        db_session.add_all([
+            AttendanceLog(student_id=student.id, status="Failed", is_failed=True)
+            for _ in range(4)
+        ])
+        db_session.commit()
+        log = AttendanceLog(student_id=student.id, status="Failed", is_failed=True)
+
+        result, complete = analyze_in_request(db_session, log, FAR_LAT, CAMPUS_LON)
+
+        assert complete
+        assert log.id is not None
+        assert any("Multiple Failures (4 failed" in reason for reason in result.reasons)
@@ -0,0 +1,149 @@
+"""
+Unit Tests for the Face Pipeline Concurrency Helpers
+Tests batched YOLO calls and streamed batch verification, with fake models.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+
+class FakeYolo:
+    """Stands in for an Ultralytics model: one result per image, in order."""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.kwargs = None
+        self._busy = threading.Lock()
+
+    def __call__(self, images, **kwargs):
+        # Ultralytics predictors aren't thread-safe; overlapping calls are a bug
+        assert self._busy.acquire(blocking=False), "model called concurrently"
+        try:
+            self.batches.append(len(images))
+            self.kwargs = kwargs
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("inference failed")
+            return [int(image[0]) for image in images]
+        finally:
+            self._busy.release()
+
+
+def call_concurrently(batcher, model, count):
+    """Call batcher from `count` threads at once; returns {caller: result or exception}."""
+    start = threading.Barrier(count)
+    results = {}
+
+    def caller(i):
+        start.wait()
+        try:
+            results[i] = batcher(model, np.array([i]))
+        except Exception as exc:
+            results[i] = exc
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return results
+
+
+class TestYoloBatcher:
+    """Test concurrent YOLO calls sharing one inference"""
+
+    def test_lone_call_runs_immediately(self):
+        """A single caller gets its own result from a batch of one"""
+        from app.models.face_model import YoloBatcher
+
+        model = FakeYolo(delay=0)
+        batcher = YoloBatcher(imgsz=320, classes=[0])
+
+        assert batcher(model, np.array([7])) == 7
+        assert model.batches == [1]
+        assert model.kwargs == {"imgsz": 320, "classes": [0]}
+
+    def test_concurrent_callers_get_their_own_results(self):
+        """Callers waiting on a busy model are batched, each gets its own result"""
+        from app.models.face_model import YoloBatcher
+
+        model = FakeYolo()
+        results = call_concurrently(YoloBatcher(), model, 8)
+
+        assert results == {i: i for i in range(8)}
+        assert sum(model.batches) == 8
+        assert len(model.batches) < 8  # At least one call served several images
+
+    def test_error_reaches_every_caller_in_batch(self):
+        """A failed inference raises in every caller it was run for"""
+        from app.models.face_model import YoloBatcher
+
+        model = FakeYolo(fail=True)
+        results = call_concurrently(YoloBatcher(), model, 4)
+
+        assert len(results) == 4
+        assert all(isinstance(r, RuntimeError) for r in results.values())
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    """face_service with a fake verify_student, on a 4-thread executor."""
+    import app.services.face_service as module
+
+    # A stand-in detector, so the real one is never built or trained
+    monkeypatch.setattr(module.FaceService, "_detector", object())
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(module, "_BATCH_EXECUTOR", executor)
+    fake = SimpleNamespace(service=module.face_service, calls=[], delays={})
+
+    def verify_student(frame_bytes):
+        fake.calls.append(frame_bytes)
+        time.sleep(fake.delays.get(frame_bytes, 0.02))
+        return {"status": "success", "frame": frame_bytes}
+
+    monkeypatch.setattr(fake.service, "verify_student", verify_student)
+    yield fake
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+class TestIterVerifyStudents:
+    """Test streamed, parallel verification of a multi-frame upload"""
+
+    def test_results_follow_frame_order(self, fake):
+        """Results come back in frame order even when later frames finish first"""
+        frames = [b"a", b"b", b"a", b"c", b"d"]
+        fake.delays = {b"a": 0.1, b"b": 0.05, b"c": 0.0, b"d": 0.0}
+
+        results = list(fake.service.iter_verify_students(frames))
+
+        assert [r["frame"] for r in results] == frames
+        # Repeated frames are verified once
+        assert sorted(fake.calls) == [b"a", b"b", b"c", b"d"]
+
+    def test_results_are_independent_copies(self, fake):
+        """Callers can mutate a result without touching its duplicates"""
+        results = fake.service.verify_students_batch([b"a", b"a"])
+
+        results[0]["status"] = "changed"
+        assert results[1]["status"] == "success"
+
+    def test_closing_early_cancels_queued_frames(self, fake):
+        """Stopping after the first result leaves the remaining frames unverified"""
+        frames = [bytes([i]) for i in range(40)]
+
+        results = fake.service.iter_verify_students(frames)
+        assert next(results)["frame"] == frames[0]
+        results.close()
+
+        time.sleep(0.1)  # Let frames that were already running finish
+        verified = len(fake.calls)
+        time.sleep(0.1)
+        assert verified < len(frames)
+        assert len(fake.calls) == verified
@@ -0,0 +1,103 @@
+"""
+Unit Tests for the GET Response Cache
+Tests TTL/LRU behaviour and invalidation on committed Student/AttendanceLog writes.
+"""
+
+import pytest
+
+from app.models.attendance import Student, AttendanceLog
+from app.services.response_cache import ResponseCache, students_cache, logs_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    students_cache.invalidate()
+    logs_cache.invalidate()
+    yield
+    students_cache.invalidate()
+    logs_cache.invalidate()
+
+
+def cached(cache, key="key"):
+    """Body stored for key, or None on a miss."""
+    return cache.get_or_build(key, lambda: None)
+
+
+class TestResponseCache:
+    """Test the cache on its own"""
+
+    def test_hit_reuses_body(self):
+        """A second lookup within the TTL does not rebuild"""
+        cache = ResponseCache(ttl=60)
+        builds = []
+        build = lambda: builds.append(1) or b"body"
+
+        assert cache.get_or_build("k", build) == b"body"
+        assert cache.get_or_build("k", build) == b"body"
+        assert len(builds) == 1
+
+    def test_expired_entry_is_rebuilt(self):
+        """Entries past their TTL are rebuilt"""
+        cache = ResponseCache(ttl=0)
+        assert cache.get_or_build("k", lambda: b"old") == b"old"
+        assert cache.get_or_build("k", lambda: b"new") == b"new"
+
+    def test_least_recently_used_is_evicted(self):
+        """maxsize bounds the entries, dropping the least recently used"""
+        cache = ResponseCache(ttl=60, maxsize=2)
+        cache.get_or_build("a", lambda: b"a")
+        cache.get_or_build("b", lambda: b"b")
+        cache.get_or_build("a", lambda: b"unused")  # a is now most recent
+        cache.get_or_build("c", lambda: b"c")
+
+        assert cache.get_or_build("a", lambda: b"rebuilt") == b"a"
+        assert cache.get_or_build("b", lambda: b"rebuilt") == b"rebuilt"
+
+    def test_invalidate_during_build_is_not_stored(self):
+        """A body built across an invalidation is returned but not cached"""
+        cache = ResponseCache(ttl=60)
+
+        def build():
+            cache.invalidate()  # A write commits while the body is being built
+            return b"stale"
+
+        assert cache.get_or_build("k", build) == b"stale"
+        assert cache.get_or_build("k", lambda: b"fresh") == b"fresh"
+
+
+class TestResponseCacheInvalidation:
+    """Test ORM-event invalidation on commit"""
+
+    def test_student_commit_clears_both_caches(self, db_session):
+        """Students appear in /students and in /logs rows"""
+        students_cache.get_or_build("key", lambda: b"students")
+        logs_cache.get_or_build("key", lambda: b"logs")
+
+        db_session.add(Student(name="Jane Doe", roll_number="R1", photo_folder_path="x"))
+        db_session.commit()
+
+        assert cached(students_cache) is None
+        assert cached(logs_cache) is None
+
+    def test_log_commit_clears_logs_only(self, db_session):
+        """Attendance logs don't change the student list"""
+        db_session.add(Student(name="Jane Doe", roll_number="R1", photo_folder_path="x"))
+        db_session.commit()
+        students_cache.get_or_build("key", lambda: b"students")
+        logs_cache.get_or_build("key", lambda: b"logs")
+
+        db_session.add(AttendanceLog(student_id=1, status="Verified"))
+        db_session.commit()
+
+        assert cached(students_cache) == b"students"
+        assert cached(logs_cache) is None
+
+    def test_flush_without_commit_keeps_cache(self, db_session):
+        """Uncommitted writes aren't visible to readers yet, so nothing is dropped"""
+        logs_cache.get_or_build("key", lambda: b"logs")
+
+        db_session.add(AttendanceLog(status="Verified"))
+        db_session.flush()
+
+        assert cached(logs_cache) == b"logs"
+        db_session.rollback()
@@ -0,0 +1,127 @@
+"""
+Unit Tests for the CP-SAT Timetable Solver
+Tests hard constraints, warm-started re-solves and infeasibility reporting.
+"""
+
+from collections import Counter
+
+import pytest
+
+from app.models.timetable import Teacher, Room, Subject, ClassGroup, TimetableEntry
+from app.services.timetable_solver import TimetableSolver
+
+# Small week so the model solves in well under a second
+DAYS = 2
+PERIODS = 2
+
+
+def make_solver(db):
+    solver = TimetableSolver(db)
+    solver.days = range(DAYS)
+    solver.periods = range(PERIODS)
+    solver.solver.parameters.max_time_in_seconds = 30
+    return solver
+
+
+@pytest.fixture
+def school(db_session):
+    """Two class groups, a theory and a lab subject, two teachers for each."""
+    math = Subject(name="Mathematics", code="MA101", weekly_sessions=2, requires_lab=False)
+    lab = Subject(name="Physics Lab", code="PH101L", weekly_sessions=2, requires_lab=True)
+    teachers = [
+        Teacher(name="T1", email="t1@x.edu", subjects=[math]),
+        Teacher(name="T2", email="t2@x.edu", subjects=[math]),
+        Teacher(name="T3", email="t3@x.edu", subjects=[lab]),
+        Teacher(name="T4", email="t4@x.edu", subjects=[lab]),
+    ]
+    rooms = [
+        Room(room_number="101", capacity=60, is_lab=False),
+        Room(room_number="102", capacity=60, is_lab=False),
+        Room(room_number="L1", capacity=30, is_lab=True, room_type="Lab"),
+        Room(room_number="L2", capacity=30, is_lab=True, room_type="Lab"),
+    ]
+    groups = [
+        ClassGroup(name="CSE-A", semester=1, strength=30),
+        ClassGroup(name="CSE-B", semester=1, strength=30),
+    ]
+    db_session.add_all(teachers + rooms + groups + [math, lab])
+    db_session.commit()
+    return db_session
+
+
+def assert_valid_schedule(db, schedule):
+    subjects = {s.id: s for s in db.query(Subject).all()}
+    rooms = {r.id: r for r in db.query(Room).all()}
+    teachers = {t.id: t for t in db.query(Teacher).all()}
+    groups = db.query(ClassGroup).all()
+
+    # Every slot of every class group is filled exactly once
+    assert len(schedule) == len(groups) * DAYS * PERIODS
+    assert len({(e["class_group_id"], e["day"], e["period"]) for e in schedule}) == len(schedule)
+
+    for entry in schedule:
+        subject = subjects[entry["subject_id"]]
+        # Lab subjects only in lab rooms
+        if subject.requires_lab:
+            assert rooms[entry["room_id"]].is_lab
+        # Only teachers assigned to the subject
+        assert subject in teachers[entry["teacher_id"]].subjects
+
+    # No teacher or room is in two places at once
+    teacher_slots = Counter((e["day"], e["period"], e["teacher_id"]) for e in schedule)
+    room_slots = Counter((e["day"], e["period"], e["room_id"]) for e in schedule)
+    assert max(teacher_slots.values()) == 1
+    assert max(room_slots.values()) == 1
+
+    # Weekly session counts are met for every class group
+    counts = Counter((e["class_group_id"], e["subject_id"]) for e in schedule)
+    for group in groups:
+        for subject in subjects.values():
+            assert counts[(group.id, subject.id)] == subject.weekly_sessions
+
+
+class TestTimetableSolver:
+    """Test the CP-SAT timetable model"""
+
+    def test_schedule_satisfies_hard_constraints(self, school):
+        """Labs in lab rooms, no clashes, weekly counts met"""
+        ok, result = make_solver(school).solve()
+
+        assert ok, result
+        assert result["status"] in ("optimal", "feasible")
+        assert_valid_schedule(school, result["schedule"])
+
+    def test_hinted_resolve_stays_feasible(self, school):
+        """Re-solving from a saved timetable hints every slot and stays valid"""
+        solver = make_solver(school)
+        ok, result = solver.solve()
+        assert ok
+        assert solver.save_to_database(result["schedule"])
+        assert school.query(TimetableEntry).count() == len(result["schedule"])
+
+        hint_solver = make_solver(school)
+        resources = hint_solver.load_resources()
+        variables = hint_solver.create_variables(resources)
+        assert hint_solver.add_solution_hint(resources, variables) == len(result["schedule"])
+
+        ok, resolved = make_solver(school).solve()
+        assert ok, resolved
+        assert_valid_schedule(school, resolved["schedule"])
+
+    def test_teacher_clash_reported_infeasible(self, db_session):
+        """Two class groups sharing their only teacher cannot both be taught"""
+        subject = Subject(name="Mathematics", code="MA101", weekly_sessions=DAYS * PERIODS)
+        db_session.add_all([
+            subject,
+            Teacher(name="T1", email="t1@x.edu", subjects=[subject]),
+            Room(room_number="101", capacity=60),
+            Room(room_number="102", capacity=60),
+            ClassGroup(name="CSE-A", semester=1, strength=30),
+            ClassGroup(name="CSE-B", semester=1, strength=30),
+        ])
+        db_session.commit()
+
+        ok, result = make_solver(db_session).solve()
+
+        assert not ok
+        assert result["status"] == "infeasible"
@@ -177,6 +177,23 @@ class TestLivenessDetection:
         # Should fail or warn about insufficient frames
         # (actual behavior depends on MediaPipe availability)
         assert result.frames_analyzed <= 2
+    
+    def test_blink_counting(self):
+        """Test blink detection over an EAR sequence"""
+        from app.services.liveness_service import LivenessService
+        
+        service = LivenessService()
+        service.ear_threshold = 0.21
+        service.min_blink_frames = 2
+        
+        # Closed run of 2 frames, then open again = 1 blink
+        assert service.count_blinks([0.3, 0.1, 0.1, 0.3]) == 1
+        # Single closed frame is too short to count
+        assert service.count_blinks([0.3, 0.1, 0.3]) == 0
+        # Eyes never reopen = no completed blink
+        assert service.count_blinks([0.3, 0.1, 0.1, 0.1]) == 0
+        # Frames without a face (-1) don't break a run
+        assert service.count_blinks([0.3, 0.1, -1, 0.1, 0.3, 0.1, 0.1, 0.3]) == 2
 
 
 class TestVerificationService:
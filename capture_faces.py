@@ -55,6 +55,9 @@ face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_fronta
 
 captured = 0
 target = 30  # Capture 30 images for good training
+# Numbering continues after the images already in the folder; counted once
+# here rather than re-globbing the folder on every save
+next_num = max([int(f.stem) for f in person_folder.glob("*.jpg") if f.stem.isdigit()] + [0]) + 1
 
 print(f"\n🎯 Goal: Capture {target} face images")
 print("\n📋 Instructions:")
@@ -119,12 +122,9 @@ while captured < target:
         for i, (x, y, w, h) in enumerate(faces):
             face_img = frame[y:y+h, x:x+w]
             
-            # Get next number
-            existing = list(person_folder.glob("*.jpg"))
-            next_num = max([int(f.stem) for f in existing if f.stem.isdigit()] + [0]) + 1
-            
             filename = person_folder / f"{next_num}.jpg"
             cv2.imwrite(str(filename), face_img)
+            next_num += 1
             captured += 1
             print(f"   ✅ Captured {captured}/{target}: {filename.name}")
             
@@ -16,12 +16,8 @@ print("=" * 80)
 print("🎓 ENTERPRISE FACE RECOGNITION TRAINING")
 print("=" * 80)
 
-# Initialize detector
-print("\n[1/4] Initializing face detector...")
-detector = FaceDetector()
-
 # Check for existing training data
-print(f"\n[2/4] Checking training data directory: {DATA_FACE_DIR}")
+print(f"\n[1/4] Checking training data directory: {DATA_FACE_DIR}")
 DATA_FACE_DIR.mkdir(parents=True, exist_ok=True)
 
 person_folders = [f for f in DATA_FACE_DIR.iterdir() if f.is_dir() and not f.name.startswith('unknown')]
@@ -47,6 +43,10 @@ for folder in person_folders:
     image_count = len(list(folder.glob("*.jpg"))) + len(list(folder.glob("*.png")))
     print(f"   • {folder.name}: {image_count} images")
 
+# Initialize detector; skip its cache load/incremental train since we retrain below
+print("\n[2/4] Initializing face detector...")
+detector = FaceDetector(load=False)
+
 # Force retrain
 print("\n[3/4] Training face recognition model...")
 print("   This may take a moment...\n")